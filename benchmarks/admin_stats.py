@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Admin dashboard-stats benchmark.
+
+Compares the old six-query statistics with the single aggregate query and
+with the cached GET /api/admin/dashboard-stats endpoint.
+
+Usage:
+    python benchmarks/admin_stats.py                       # 100k donations
+    python benchmarks/admin_stats.py --donations 500000 --iterations 50
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def timed(func, iterations):
+    """Mean milliseconds per call"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Admin dashboard-stats benchmark")
+    parser.add_argument('--database-url', type=str,
+                        help='Database to run against (default: temporary SQLite file)')
+    parser.add_argument('--donations', type=int, default=100000,
+                        help='Number of donations to generate (default: 100000)')
+    parser.add_argument('--donors', type=int, default=2000,
+                        help='Number of donors to generate (default: 2000)')
+    parser.add_argument('--students', type=int, default=1000,
+                        help='Number of student profiles to generate (default: 1000)')
+    parser.add_argument('--iterations', type=int, default=20,
+                        help='Calls per measurement (default: 20)')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'stats.db')
+    # Keep the per-request SQL log lines out of the report
+    os.environ.setdefault('SQL_STATS_LOG', 'false')
+
+    sys.path.insert(0, ROOT)
+    from server.app import create_app
+    from server.models import db, User, StudentProfile, Donation
+    from server.routes.admin import compute_admin_stats
+    from server.utils.cache import invalidate_admin_stats
+
+    app = create_app()
+    rng = random.Random(42)
+    now = datetime.utcnow()
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        print(f"Generating {args.donors} donors, {args.students} students, {args.donations} donations...")
+        users = [
+            {'username': f'donor{i}', 'email': f'donor{i}@example.com', '_password_hash': 'x', 'role': 'donor', 'created_at': now}
+            for i in range(args.donors)
+        ] + [
+            {'username': f'student{i}', 'email': f'student{i}@example.com', '_password_hash': 'x', 'role': 'student', 'created_at': now}
+            for i in range(args.students)
+        ] + [
+            {'username': 'admin', 'email': 'admin@example.com', '_password_hash': 'x', 'role': 'admin', 'created_at': now}
+        ]
+        db.session.execute(User.__table__.insert(), users)
+        db.session.execute(StudentProfile.__table__.insert(), [
+            {
+                'user_id': args.donors + i + 1, 'full_name': f'Student {i}', 'academic_level': 'secondary',
+                'school_name': 'Bench School', 'fee_amount': 50000.0, 'amount_raised': 0.0,
+                'story': 'A' * 60, 'is_verified': rng.random() < 0.75, 'created_at': now
+            }
+            for i in range(args.students)
+        ])
+        chunk = 10000
+        for start in range(0, args.donations, chunk):
+            db.session.execute(Donation.__table__.insert(), [
+                {
+                    'donor_id': rng.randint(1, args.donors), 'student_profile_id': rng.randint(1, args.students),
+                    'amount': float(rng.choice([1000, 2500, 5000])), 'is_anonymous': False,
+                    'message': '', 'payment_method': 'mpesa', 'created_at': now - timedelta(minutes=i)
+                }
+                for i in range(start, min(start + chunk, args.donations))
+            ])
+        db.session.commit()
+        admin_id = db.session.query(User.id).filter_by(role='admin').scalar()
+
+        def six_queries():
+            # The statistics as they were computed before the combined query
+            StudentProfile.query.count()
+            StudentProfile.query.filter_by(is_verified=True).count()
+            StudentProfile.query.filter_by(is_verified=False).count()
+            User.query.filter_by(role='donor').count()
+            Donation.query.count()
+            db.session.query(db.func.sum(Donation.amount)).scalar()
+
+        assert compute_admin_stats()['total_donations'] == args.donations
+
+        before = timed(six_queries, args.iterations)
+        after = timed(compute_admin_stats, args.iterations)
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = admin_id
+        sess['user_role'] = 'admin'
+
+    def uncached_request():
+        invalidate_admin_stats()
+        client.get('/api/admin/dashboard-stats')
+
+    uncached = timed(uncached_request, args.iterations)
+    client.get('/api/admin/dashboard-stats')
+    cached = timed(lambda: client.get('/api/admin/dashboard-stats'), args.iterations)
+
+    with app.app_context():
+        db.drop_all()
+
+    print(f"Six separate queries:        {before:8.2f} ms")
+    print(f"Single aggregate query:      {after:8.2f} ms")
+    print(f"Endpoint, cache miss:        {uncached:8.2f} ms")
+    print(f"Endpoint, cache hit:         {cached:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Session check latency benchmark.
+
+Times GET /api/check-session (full and ?lite=true) and
+GET /api/my-profile/summary for a logged-in student, in-process, and
+fails if a p95 latency target is missed.
+
+Usage:
+    python benchmarks/check_session_latency.py
+    python benchmarks/check_session_latency.py --session-type memory --iterations 1000 --lite-p95 3
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(client, path, iterations, headers=None, expected=200):
+    """Latency samples in milliseconds"""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = client.get(path, headers=headers or {})
+        samples.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == expected, (path, response.status_code)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session check latency benchmark")
+    parser.add_argument('--iterations', type=int, default=500,
+                        help='Requests per endpoint (default: 500)')
+    parser.add_argument('--session-type', type=str, default='cookie',
+                        help='SESSION_TYPE to run with (default: cookie)')
+    parser.add_argument('--lite-p95', type=float, default=5.0,
+                        help='p95 target in ms for ?lite=true (default: 5)')
+    parser.add_argument('--summary-p95', type=float, default=10.0,
+                        help='p95 target in ms for /api/my-profile/summary (default: 10)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'session.db')
+    # Keep the per-request SQL log lines out of the report
+    os.environ.setdefault('SQL_STATS_LOG', 'false')
+    os.environ['SESSION_TYPE'] = args.session_type
+
+    sys.path.insert(0, ROOT)
+    from server.app import create_app
+    from server.models import db, User, StudentProfile
+
+    app = create_app()
+    app.config['SESSION_FILE_PATH'] = os.path.join(workdir, 'sessions.db')
+    password = 'Password123!'
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username='bench student', email='student@example.com', role='student')
+        user.password = password
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(StudentProfile(
+            user_id=user.id,
+            full_name='Bench Student',
+            story='Benchmark profile ' * 20,
+            academic_level='University',
+            school_name='Bench University',
+            fee_amount=100000,
+            amount_raised=25000,
+            is_verified=True
+        ))
+        db.session.commit()
+
+    client = app.test_client()
+    response = client.post('/api/login', json={'email': 'student@example.com', 'password': password})
+    assert response.status_code == 200, response.get_json()
+
+    etag = client.get('/api/my-profile/summary').headers['ETag']
+    results = [
+        ('check-session (full)', measure(client, '/api/check-session', args.iterations), None),
+        ('check-session?lite=true', measure(client, '/api/check-session?lite=true', args.iterations), args.lite_p95),
+        ('my-profile/summary', measure(client, '/api/my-profile/summary', args.iterations), args.summary_p95),
+        ('my-profile/summary (304)', measure(client, '/api/my-profile/summary', args.iterations,
+                                             headers={'If-None-Match': etag}, expected=304), args.summary_p95),
+    ]
+
+    missed = []
+    print(f"session type: {args.session_type}, {args.iterations} requests each")
+    print(f"{'endpoint':<28}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'target':>10}")
+    for name, samples, target in results:
+        p95 = percentile(samples, 95)
+        print(f"{name:<28}{percentile(samples, 50):>10.2f}{p95:>10.2f}{percentile(samples, 99):>10.2f}"
+              f"{(f'{target:.1f}' if target else '-'):>10}")
+        if target and p95 > target:
+            missed.append(name)
+
+    with app.app_context():
+        db.drop_all()
+
+    if missed:
+        print(f"p95 target missed: {', '.join(missed)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
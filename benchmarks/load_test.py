@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Endpoint load test.
+
+Seeds a dataset profile from seed.py, then runs concurrent virtual users
+that each log in as a donor and replay a weighted mix of browsing, login,
+donation and follow traffic. Reports p50/p95/p99 latency, throughput and
+SQL queries per request for each endpoint, and writes the results as JSON
+so runs on different commits can be compared.
+
+Targets:
+    inprocess  Flask test client, no network (default)
+    server     a threaded werkzeug server started on a free local port,
+               driven over HTTP (or --base-url for a server you started)
+
+Usage:
+    python benchmarks/load_test.py                                   # mixed traffic, small profile
+    python benchmarks/load_test.py --profile launch-day --mix browse --concurrency 16 --duration 30
+    python benchmarks/load_test.py --target server --output /tmp/after.json --compare /tmp/before.json
+
+The target database is dropped and re-seeded unless --skip-seed is given,
+so point --database-url at a scratch database.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PASSWORD = 'Password123!'
+
+# Relative weights of each operation per traffic mix
+MIXES = {
+    'browse': {
+        'catalog': 45, 'catalog_next_page': 15, 'catalog_filtered': 10, 'student_detail': 30
+    },
+    'login': {
+        'login': 60, 'check_session': 40
+    },
+    'donate': {
+        'student_detail': 40, 'donate': 45, 'my_donations': 15
+    },
+    'follow': {
+        'student_detail': 30, 'follow': 50, 'followed_students': 20
+    },
+    'mixed': {
+        'catalog': 25, 'catalog_next_page': 8, 'catalog_filtered': 5, 'student_detail': 20,
+        'check_session': 15, 'login': 2, 'donate': 8, 'my_donations': 4, 'follow': 8,
+        'followed_students': 5
+    }
+}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class InProcessClient:
+    """Flask test client; keeps its own session cookie"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, payload=None):
+        response = self.client.open(path, method=method, json=payload)
+        return response.status_code, response.headers, response.get_json(silent=True)
+
+
+class HttpClient:
+    """requests.Session against a running server; keeps its own cookies"""
+
+    def __init__(self, base_url):
+        import requests
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+
+    def request(self, method, path, payload=None):
+        response = self.session.request(method, self.base_url + path, json=payload, timeout=30)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, response.headers, body
+
+
+class Recorder:
+    """Thread-safe per-endpoint samples"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def add(self, name, status, elapsed_ms, queries):
+        with self._lock:
+            entry = self.samples.setdefault(name, {'latencies': [], 'queries': [], 'statuses': {}})
+            entry['latencies'].append(elapsed_ms)
+            if queries is not None:
+                entry['queries'].append(queries)
+            entry['statuses'][str(status)] = entry['statuses'].get(str(status), 0) + 1
+
+    def summary(self, elapsed):
+        endpoints = {}
+        for name, entry in sorted(self.samples.items()):
+            latencies = entry['latencies']
+            errors = sum(count for status, count in entry['statuses'].items() if int(status) >= 500)
+            endpoints[name] = {
+                'count': len(latencies),
+                'errors': errors,
+                'statuses': entry['statuses'],
+                'throughput_rps': len(latencies) / elapsed,
+                'mean_ms': sum(latencies) / len(latencies),
+                'p50_ms': percentile(latencies, 50),
+                'p95_ms': percentile(latencies, 95),
+                'p99_ms': percentile(latencies, 99),
+                'mean_queries': sum(entry['queries']) / len(entry['queries']) if entry['queries'] else None,
+                'max_queries': max(entry['queries']) if entry['queries'] else None
+            }
+        total = sum(endpoint['count'] for endpoint in endpoints.values())
+        return {
+            'requests': total,
+            'errors': sum(endpoint['errors'] for endpoint in endpoints.values()),
+            'throughput_rps': total / elapsed
+        }, endpoints
+
+
+class VirtualUser:
+    """One logged-in donor replaying a traffic mix"""
+
+    def __init__(self, client, recorder, email, student_ids, student_weights, rng):
+        self.client = client
+        self.recorder = recorder
+        self.email = email
+        self.student_ids = student_ids
+        self.student_weights = student_weights
+        self.rng = rng
+        self.cursor = None
+
+    def call(self, name, method, path, payload=None):
+        started = time.perf_counter()
+        status, headers, body = self.client.request(method, path, payload)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        queries = headers.get('X-Query-Count')
+        self.recorder.add(name, status, elapsed_ms, int(queries) if queries is not None else None)
+        return status, body
+
+    def pick_student(self):
+        # Popular campaigns get most of the views, as in the seeded data
+        return self.rng.choices(self.student_ids, weights=self.student_weights)[0]
+
+    def login(self):
+        return self.call('login', 'POST', '/api/login', {'email': self.email, 'password': PASSWORD})
+
+    def catalog(self):
+        status, body = self.call('catalog', 'GET', '/api/students?limit=20')
+        self.cursor = (body or {}).get('next_cursor')
+
+    def catalog_next_page(self):
+        if not self.cursor:
+            return self.catalog()
+        status, body = self.call('catalog_next_page', 'GET', f'/api/students?limit=20&cursor={self.cursor}')
+        self.cursor = (body or {}).get('next_cursor')
+
+    def catalog_filtered(self):
+        level = self.rng.choice(['primary', 'secondary', 'university'])
+        self.call('catalog_filtered', 'GET', f'/api/students?limit=20&academic_level={level}&funding_status=active')
+
+    def student_detail(self):
+        self.call('student_detail', 'GET', f'/api/students/{self.pick_student()}')
+
+    def check_session(self):
+        self.call('check_session', 'GET', '/api/check-session?lite=true')
+
+    def donate(self):
+        self.call('donate', 'POST', '/api/donations', {
+            'student_id': self.pick_student(),
+            'amount': self.rng.choice([100, 250, 500, 1000]),
+            'message': 'Load test'
+        })
+
+    def my_donations(self):
+        self.call('my_donations', 'GET', '/api/donations')
+
+    def follow(self):
+        student_id = self.pick_student()
+        status, _ = self.call('follow', 'POST', f'/api/students/{student_id}/follow')
+        if status == 400:
+            self.call('unfollow', 'DELETE', f'/api/students/{student_id}/unfollow')
+
+    def followed_students(self):
+        self.call('followed_students', 'GET', '/api/my-followed-students')
+
+    def run(self, mix, deadline):
+        operations = list(mix)
+        weights = [mix[operation] for operation in operations]
+        while time.perf_counter() < deadline:
+            getattr(self, self.rng.choices(operations, weights=weights)[0])()
+
+
+def print_report(totals, endpoints, baseline=None):
+    print(f"{'endpoint':<20}{'count':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'queries':>9}{'5xx':>6}{'p95 vs base':>13}")
+    for name, endpoint in endpoints.items():
+        queries = '-' if endpoint['mean_queries'] is None else f"{endpoint['mean_queries']:.1f}"
+        change = ''
+        if baseline and name in baseline.get('endpoints', {}):
+            base_p95 = baseline['endpoints'][name]['p95_ms']
+            change = f"{(endpoint['p95_ms'] - base_p95) / base_p95 * 100:+.0f}%" if base_p95 else ''
+        print(f"{name:<20}{endpoint['count']:>8}{endpoint['throughput_rps']:>9.1f}{endpoint['p50_ms']:>9.2f}"
+              f"{endpoint['p95_ms']:>9.2f}{endpoint['p99_ms']:>9.2f}{queries:>9}{endpoint['errors']:>6}{change:>13}")
+    print(f"total: {totals['requests']} requests, {totals['throughput_rps']:.1f} req/s, {totals['errors']} 5xx")
+
+
+def regressions(endpoints, baseline, threshold):
+    """Endpoints whose p95 grew by more than threshold percent over the baseline"""
+    slower = []
+    for name, endpoint in endpoints.items():
+        base = baseline.get('endpoints', {}).get(name)
+        if base and base['p95_ms'] and (endpoint['p95_ms'] - base['p95_ms']) / base['p95_ms'] * 100 > threshold:
+            slower.append(name)
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Endpoint load test")
+    parser.add_argument('--target', choices=['inprocess', 'server'], default='inprocess',
+                        help='Drive the Flask test client or a local HTTP server (default: inprocess)')
+    parser.add_argument('--base-url', type=str,
+                        help='With --target server, use this already running server instead of starting one')
+    parser.add_argument('--database-url', type=str,
+                        help='Database to run against (default: temporary SQLite file)')
+    parser.add_argument('--profile', type=str, default='small',
+                        help='seed.py dataset profile (default: small)')
+    parser.add_argument('--skip-seed', action='store_true',
+                        help='Reuse the data already in --database-url')
+    parser.add_argument('--mix', choices=sorted(MIXES), default='mixed',
+                        help='Traffic mix (default: mixed)')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='Concurrent virtual users (default: 8)')
+    parser.add_argument('--duration', type=float, default=20,
+                        help='Seconds to run (default: 20)')
+    parser.add_argument('--seed', type=int, default=1,
+                        help='Seed for the virtual users\' choices (default: 1)')
+    parser.add_argument('--output', type=str,
+                        help='Results file (default: benchmarks/results/<commit>-<target>-<mix>.json)')
+    parser.add_argument('--compare', type=str,
+                        help='Earlier results file; exit non-zero if an endpoint p95 regressed')
+    parser.add_argument('--regression-threshold', type=float, default=20,
+                        help='Allowed p95 increase over --compare, in percent (default: 20)')
+    args = parser.parse_args()
+
+    database_url = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'load.db')
+    # Config reads DATABASE_URL at import time
+    os.environ['DATABASE_URL'] = database_url
+    # Keep the per-request SQL log lines out of the report
+    os.environ.setdefault('SQL_STATS_LOG', 'false')
+
+    sys.path.insert(0, ROOT)
+    import seed
+    from server.app import create_app
+    from server.models import db, User, StudentProfile, Donation
+
+    seed.logger.setLevel('WARNING')
+    app = create_app()
+    # Per-request query counts come back in X-Query-Count
+    app.config['SQL_STATS_HEADERS'] = True
+
+    with app.app_context():
+        if not args.skip_seed:
+            profile = dict(seed.DATASET_PROFILES[args.profile])
+            print(f"Seeding profile '{args.profile}'...")
+            db.drop_all()
+            db.create_all()
+            seed.DatabaseSeeder(app).generate_bulk_data(**profile)
+        # Most-donated campaigns first; view weights fall off with rank
+        popular = db.session.query(StudentProfile.id).filter(StudentProfile.is_verified.is_(True)).outerjoin(
+            Donation, Donation.student_profile_id == StudentProfile.id
+        ).group_by(StudentProfile.id).order_by(db.func.count(Donation.id).desc(), StudentProfile.id).all()
+        student_ids = [student_id for (student_id,) in popular]
+        donor_emails = [email for (email,) in db.session.query(User.email).filter(
+            User.role == 'donor', User.email.like('donor%@example.com')
+        ).order_by(User.id).limit(args.concurrency)]
+        db.session.remove()
+    if not student_ids or len(donor_emails) < args.concurrency:
+        sys.exit("Dataset needs verified students and at least --concurrency seeded donors")
+    student_weights = [rank ** -0.8 for rank in range(1, len(student_ids) + 1)]
+
+    server = None
+    if args.target == 'inprocess':
+        make_client = lambda: InProcessClient(app)
+    elif args.base_url:
+        make_client = lambda: HttpClient(args.base_url)
+    else:
+        import logging
+        from werkzeug.serving import make_server
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_port}'
+        make_client = lambda: HttpClient(base_url)
+
+    recorder = Recorder()
+    users = []
+    for index, email in enumerate(donor_emails):
+        user = VirtualUser(make_client(), recorder, email, student_ids, student_weights,
+                           random.Random(args.seed * 1000 + index))
+        status, body = user.login()
+        if status != 200:
+            sys.exit(f"Login failed for {email}: {status} {body}")
+        users.append(user)
+    recorder = Recorder()
+    for user in users:
+        user.recorder = recorder
+
+    print(f"Running '{args.mix}' mix: {args.concurrency} users for {args.duration:.0f}s against {args.target}...")
+    started = time.perf_counter()
+    deadline = started + args.duration
+    threads = [threading.Thread(target=user.run, args=(MIXES[args.mix], deadline)) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if server:
+        server.shutdown()
+
+    totals, endpoints = recorder.summary(elapsed)
+    results = {
+        'commit': git_commit(),
+        'created_at': datetime.utcnow().isoformat(),
+        'target': args.target,
+        'database': database_url.split(':', 1)[0],
+        'profile': None if args.skip_seed else args.profile,
+        'mix': args.mix,
+        'concurrency': args.concurrency,
+        'duration_s': elapsed,
+        'seed': args.seed,
+        'totals': totals,
+        'endpoints': endpoints
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"Comparing with {args.compare} (commit {baseline.get('commit')})")
+    print_report(totals, endpoints, baseline)
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f"{results['commit']}-{args.target}-{args.mix}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if baseline:
+        slower = regressions(endpoints, baseline, args.regression_threshold)
+        if slower:
+            print(f"p95 regressed by more than {args.regression_threshold:.0f}%: {', '.join(slower)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
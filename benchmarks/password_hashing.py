@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Password hashing cost benchmark.
+
+For each hashing setting, measures hash and verify time and the sequential
+POST /api/login throughput of a single worker, which is bounded by one
+password verification per request.
+
+Usage:
+    python benchmarks/password_hashing.py
+    python benchmarks/password_hashing.py --methods pbkdf2:sha256:600000 scrypt:32768:8:1 --logins 50
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_METHODS = [
+    'pbkdf2:sha256:1000000',
+    'pbkdf2:sha256:600000',
+    'pbkdf2:sha256:310000',
+    'scrypt:32768:8:1',
+    'scrypt:16384:8:1',
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Password hashing cost benchmark")
+    parser.add_argument('--methods', nargs='+', default=DEFAULT_METHODS,
+                        help='werkzeug hash methods to compare')
+    parser.add_argument('--logins', type=int, default=20,
+                        help='Logins per setting (default: 20)')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'hashing.db')
+    # Keep the per-request SQL log lines out of the report
+    os.environ.setdefault('SQL_STATS_LOG', 'false')
+
+    sys.path.insert(0, ROOT)
+    from werkzeug.security import check_password_hash, generate_password_hash
+    from server.app import create_app
+    from server.models import db, User
+
+    app = create_app()
+    password = 'Password123!'
+
+    print(f"{'method':<26}{'hash ms':>10}{'verify ms':>12}{'logins/s/worker':>18}")
+    for method in args.methods:
+        app.config['PASSWORD_HASH_METHOD'] = method
+
+        started = time.perf_counter()
+        stored = generate_password_hash(password, method=method, salt_length=16)
+        hash_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        check_password_hash(stored, password)
+        verify_ms = (time.perf_counter() - started) * 1000
+
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            user = User(username='bench user', email='bench@example.com', role='donor')
+            user.password = password
+            db.session.add(user)
+            db.session.commit()
+
+        client = app.test_client()
+        started = time.perf_counter()
+        for _ in range(args.logins):
+            response = client.post('/api/login', json={'email': 'bench@example.com', 'password': password})
+            assert response.status_code == 200, response.get_json()
+        throughput = args.logins / (time.perf_counter() - started)
+
+        print(f"{method:<26}{hash_ms:>10.1f}{verify_ms:>12.1f}{throughput:>18.1f}")
+
+    with app.app_context():
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
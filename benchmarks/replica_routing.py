@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Read-replica routing check.
+
+Seeds a primary database (a temporary SQLite file), copies it to a second
+one that stands in for the replica and renames one student there only, so
+each response shows which database served it. Then checks that:
+
+    - anonymous GETs are served by the replica
+    - writes go to the primary
+    - a client that just wrote reads from the primary (read-your-writes)
+    - once the pin expires that client reads from the replica again
+    - the shared catalog cache is filled from the primary, and the catalog
+      ETag follows the primary's version rather than the lagging replica's
+
+Pass --primary-url/--replica-url to run against two other databases
+instead, e.g. two local Postgres instances. Both are wiped.
+
+Usage:
+    python benchmarks/replica_routing.py
+    python benchmarks/replica_routing.py --window 2
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = 'Password123!'
+
+
+def copy_tables(db, source, target):
+    """Snapshot every table from one engine into another"""
+    db.metadata.drop_all(target)
+    db.metadata.create_all(target)
+    with source.connect() as reader, target.begin() as writer:
+        for table in db.metadata.sorted_tables:
+            # Generated columns are recomputed by the target
+            columns = [column for column in table.columns if column.computed is None]
+            rows = [dict(row._mapping) for row in reader.execute(db.select(*columns))]
+            # Drop rows create_all seeded (e.g. catalog_state's single row)
+            writer.execute(table.delete())
+            if rows:
+                writer.execute(table.insert(), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-replica routing check")
+    parser.add_argument('--window', type=float, default=1.0,
+                        help='READ_YOUR_WRITES_SECONDS to run with (default: 1)')
+    parser.add_argument('--primary-url', type=str, help='Primary database URL (default: temporary SQLite file)')
+    parser.add_argument('--replica-url', type=str, help='Replica database URL (default: temporary SQLite file)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    primary_url = args.primary_url or 'sqlite:///' + os.path.join(workdir, 'primary.db')
+    replica_url = args.replica_url or 'sqlite:///' + os.path.join(workdir, 'replica.db')
+    os.environ['DATABASE_URL'] = primary_url
+    os.environ['DATABASE_REPLICA_URL'] = replica_url
+    os.environ['READ_YOUR_WRITES_SECONDS'] = str(args.window)
+    # Keep the per-request SQL log lines out of the report
+    os.environ.setdefault('SQL_STATS_LOG', 'false')
+
+    sys.path.insert(0, ROOT)
+    from server.app import create_app
+    from server.models import db, User, StudentProfile
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        donor = User(username='replica donor', email='donor@example.com', role='donor')
+        donor.password = PASSWORD
+        student_user = User(username='replica student', email='student@example.com', role='student')
+        student_user._password_hash = donor._password_hash
+        db.session.add_all([donor, student_user])
+        db.session.flush()
+        student = StudentProfile(
+            user_id=student_user.id, full_name='Primary Name', academic_level='University',
+            school_name='Replica University', fee_amount=100000, story='A' * 60, is_verified=True
+        )
+        db.session.add(student)
+        db.session.commit()
+        student_id = student.id
+
+        replica = db.engines['replica']
+        copy_tables(db, db.engines[None], replica)
+        with replica.begin() as connection:
+            connection.execute(
+                StudentProfile.__table__.update()
+                .where(StudentProfile.id == student_id)
+                .values(full_name='Replica Name')
+            )
+
+    failures = []
+
+    def check(name, condition):
+        print(f"{'ok' if condition else 'FAIL':<6}{name}")
+        if not condition:
+            failures.append(name)
+
+    def served_by(client):
+        name = client.get(f'/api/students/{student_id}').get_json()['full_name']
+        return {'Primary Name': 'primary', 'Replica Name': 'replica'}.get(name, name)
+
+    client = app.test_client()
+    check('anonymous GET is served by the replica', served_by(client) == 'replica')
+    catalog = client.get('/api/students').get_json()['students']
+    check('catalog cache is filled from the primary', [s['full_name'] for s in catalog] == ['Primary Name'])
+    etag = client.get('/api/students').headers['ETag']
+    with app.app_context():
+        with db.engines[None].begin() as connection:
+            StudentProfile.bump_catalog_version(connection)
+    response = client.get('/api/students', headers={'If-None-Match': etag})
+    check('catalog ETag follows the primary, not the replica', response.status_code == 200)
+
+    response = client.post('/api/login', json={'email': 'donor@example.com', 'password': PASSWORD})
+    assert response.status_code == 200, response.get_json()
+    check('logged-in GET is served by the replica', served_by(client) == 'replica')
+
+    response = client.post(f'/api/students/{student_id}/follow')
+    check('follow is written to the primary', response.status_code == 200)
+    with app.app_context():
+        with db.engines[None].connect() as connection:
+            primary_follows = connection.execute(db.text('SELECT COUNT(*) FROM user_student_supporters')).scalar()
+        with db.engines['replica'].connect() as connection:
+            replica_follows = connection.execute(db.text('SELECT COUNT(*) FROM user_student_supporters')).scalar()
+    check('replica did not receive the write', primary_follows == 1 and replica_follows == 0)
+
+    following = client.get(f'/api/students/{student_id}/following-status').get_json()['is_following']
+    check('GET right after the write is served by the primary', served_by(client) == 'primary' and following)
+    check('other clients still read from the replica', served_by(app.test_client()) == 'replica')
+
+    time.sleep(args.window + 0.1)
+    following = client.get(f'/api/students/{student_id}/following-status').get_json()['is_following']
+    check('GET after the pin expires is served by the replica', served_by(client) == 'replica' and not following)
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.metadata.drop_all(db.engines['replica'])
+
+    if failures:
+        print(f"{len(failures)} check(s) failed")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
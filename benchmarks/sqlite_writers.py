@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+SQLite concurrent-writer benchmark.
+
+Runs concurrent POST /api/donations writers alongside catalog readers
+against a SQLite file, once with SQLite's defaults (rollback journal,
+synchronous=FULL, no mmap) and once with the SQLITE_PRAGMAS from Config
+(WAL, synchronous=NORMAL, busy_timeout, mmap and a larger page cache).
+Reports donation throughput, failed writes ("database is locked") and
+reader latency for each.
+
+Usage:
+    python benchmarks/sqlite_writers.py
+    python benchmarks/sqlite_writers.py --writers 16 --readers 8 --duration 15
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Environment for each mode; Config reads these at import time
+MODES = {
+    'default': {
+        'SQLITE_JOURNAL_MODE': 'DELETE',
+        'SQLITE_SYNCHRONOUS': 'FULL',
+        'SQLITE_BUSY_TIMEOUT_MS': '5000',
+        'SQLITE_MMAP_SIZE': '0',
+        'SQLITE_CACHE_SIZE': '-2000'
+    },
+    'tuned': {}
+}
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_mode(args):
+    """Child process: one mode against a fresh database, results as JSON on stdout"""
+    sys.path.insert(0, ROOT)
+    from server.app import create_app
+    from server.models import db, User, StudentProfile, Donation
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        student_user = User(username='writer student', email='writer+student@example.com', role='student')
+        student_user.password = 'Password123!'
+        db.session.add(student_user)
+        donors = []
+        for i in range(args.writers):
+            donor = User(username=f'writer donor {i}', email=f'writer+donor{i}@example.com', role='donor')
+            # Sessions are set directly below, so skip the password hashing cost
+            donor._password_hash = student_user._password_hash
+            donors.append(donor)
+        db.session.add_all(donors)
+        db.session.flush()
+        for i in range(50):
+            filler = User(username=f'filler student {i}', email=f'filler{i}@example.com', role='student')
+            filler._password_hash = student_user._password_hash
+            db.session.add(filler)
+            db.session.flush()
+            db.session.add(StudentProfile(
+                user_id=filler.id, full_name=f'Filler Student {i}', academic_level='university',
+                school_name='Filler University', fee_amount=50000, story='A' * 60, is_verified=True
+            ))
+        student = StudentProfile(
+            user_id=student_user.id, full_name='Writer Student', academic_level='university',
+            school_name='Writer University', fee_amount=10 ** 9, story='A' * 60, is_verified=True
+        )
+        db.session.add(student)
+        db.session.commit()
+        donor_ids, student_id = [d.id for d in donors], student.id
+        journal_mode = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+
+    lock = threading.Lock()
+    results = {'written': 0, 'failed': 0, 'write_ms': [], 'read_ms': []}
+    deadline = time.perf_counter() + args.duration
+
+    def writer(donor_id):
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = donor_id
+            sess['user_role'] = 'donor'
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = client.post('/api/donations', json={'student_id': student_id, 'amount': 10})
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                if response.status_code == 201:
+                    results['written'] += 1
+                    results['write_ms'].append(elapsed)
+                else:
+                    results['failed'] += 1
+
+    def reader():
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            client.get(f'/api/students/{student_id}')
+            with lock:
+                results['read_ms'].append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=writer, args=(donor_id,)) for donor_id in donor_ids]
+    threads += [threading.Thread(target=reader) for _ in range(args.readers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        rows = Donation.query.count()
+        db.session.remove()
+        db.drop_all()
+
+    print(json.dumps({
+        'journal_mode': journal_mode,
+        'donations_per_s': results['written'] / elapsed,
+        'written': results['written'],
+        'failed': results['failed'],
+        'rows': rows,
+        'write_p95_ms': percentile(results['write_ms'], 95),
+        'reads_per_s': len(results['read_ms']) / elapsed,
+        'read_p95_ms': percentile(results['read_ms'], 95)
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite concurrent-writer benchmark")
+    parser.add_argument('--writers', type=int, default=8,
+                        help='Concurrent donation writers (default: 8)')
+    parser.add_argument('--readers', type=int, default=4,
+                        help='Concurrent student detail readers (default: 4)')
+    parser.add_argument('--duration', type=float, default=10,
+                        help='Seconds per mode (default: 10)')
+    parser.add_argument('--mode', choices=sorted(MODES),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        return run_mode(args)
+
+    print(f"{args.writers} writers + {args.readers} readers, {args.duration:.0f}s per mode")
+    print(f"{'mode':<10}{'journal':>9}{'donations/s':>13}{'failed':>8}{'write p95':>11}{'reads/s':>9}{'read p95':>10}")
+    for mode, overrides in MODES.items():
+        env = dict(os.environ, **overrides)
+        env['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'writers.db')
+        env.setdefault('SQL_STATS_LOG', 'false')
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--mode', mode,
+             '--writers', str(args.writers), '--readers', str(args.readers), '--duration', str(args.duration)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<10}{result['journal_mode']:>9}{result['donations_per_s']:>13.1f}{result['failed']:>8}"
+              f"{result['write_p95_ms']:>9.1f}ms{result['reads_per_s']:>9.1f}{result['read_p95_ms']:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
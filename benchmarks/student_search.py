@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Student search benchmark.
+
+Seeds a dataset profile, then times GET /api/students/search for a set of
+queries against what the client used to do: download the whole
+/api/students catalog and filter it in the browser. Also checks that a
+profile edit is searchable straight away (the index triggers) and that
+story text is HTML-escaped in the highlights.
+
+Usage:
+    python benchmarks/student_search.py
+    python benchmarks/student_search.py --profile 10x --iterations 50
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUERIES = ['university', 'nairobi school', 'strath', 'girls high', 'kenyatta univ', 'zzzz']
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Student search benchmark")
+    parser.add_argument('--profile', type=str, default='launch-day',
+                        help='seed.py dataset profile (default: launch-day)')
+    parser.add_argument('--iterations', type=int, default=100,
+                        help='Requests per query (default: 100)')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'search.db')
+    # Keep the per-request SQL log lines out of the report
+    os.environ.setdefault('SQL_STATS_LOG', 'false')
+
+    sys.path.insert(0, ROOT)
+    import seed
+    from server.app import create_app
+    from server.models import db, StudentProfile
+
+    app = create_app()
+    profile = seed.DATASET_PROFILES[args.profile]
+    with app.app_context():
+        db.create_all()
+        seeder = seed.DatabaseSeeder(app)
+        seeder.generate_bulk_data(
+            count_users=profile['count_users'],
+            count_students=profile['count_students'],
+            donations_per_student=profile['donations_per_student'],
+            seed=profile['seed'],
+            popularity_skew=profile['popularity_skew'],
+            follows_per_donor=profile['follows_per_donor']
+        )
+        student_count = StudentProfile.query.count()
+
+    client = app.test_client()
+    failures = []
+
+    print(f"{args.profile}: {student_count} students, {args.iterations} requests per query")
+    print(f"{'query':<22}{'hits':>6}{'p50 ms':>9}{'p95 ms':>9}")
+    for query in QUERIES:
+        samples = []
+        for _ in range(args.iterations):
+            started = time.perf_counter()
+            response = client.get('/api/students/search', query_string={'q': query})
+            samples.append((time.perf_counter() - started) * 1000)
+        body = response.get_json()
+        print(f"{query:<22}{body['count']:>6}{percentile(samples, 50):>9.2f}{percentile(samples, 95):>9.2f}")
+
+    # The old way: the whole catalog, filtered client-side
+    samples = []
+    for _ in range(max(1, args.iterations // 10)):
+        started = time.perf_counter()
+        students = client.get('/api/students', headers={'Cache-Control': 'no-cache'}).get_json()['students']
+        [s for s in students if 'university' in (s['full_name'] + s['school_name'] + s['story']).lower()]
+        samples.append((time.perf_counter() - started) * 1000)
+    print(f"{'full catalog + filter':<22}{'':>6}{percentile(samples, 50):>9.2f}{percentile(samples, 95):>9.2f}")
+
+    # Edits reach the index through the triggers, and highlights are escaped
+    with app.app_context():
+        student = StudentProfile.query.filter_by(is_verified=True).first()
+        student.story = 'Quokkaville scholar <script>alert(1)</script> ' + student.story
+        db.session.commit()
+        student_id = student.id
+    body = client.get('/api/students/search', query_string={'q': 'quokkaville'}).get_json()
+    if [s['id'] for s in body['students']] != [student_id]:
+        failures.append('edited profile is not searchable')
+    elif '<script>' in body['students'][0]['highlights']['story']:
+        failures.append('story highlight is not HTML-escaped')
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+    if failures:
+        print(f"❌ {', '.join(failures)}")
+        sys.exit(1)
+    print("✅ edits are searchable immediately, highlights are escaped")
+
+
+if __name__ == '__main__':
+    main()
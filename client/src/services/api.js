@@ -74,17 +74,39 @@ class ApiService {
 	}
 
 	async checkSession() {
-		return this.request("/check-session", {
+		// Identity and role only; the student profile has its own endpoint
+		return this.request("/check-session?lite=true", {
 			method: "GET",
 		});
 	}
 
+	async getMyProfileSummary() {
+		return this.request("/my-profile/summary");
+	}
+
 	// Student endpoints
 	async getStudents(verifiedOnly = true) {
 		const params = new URLSearchParams({ verified: verifiedOnly });
 		return this.request(`/students?${params}`);
 	}
 
+	// Students still raising funds, closest to their goal first
+	async getStudentsClosestToGoal(limit = 20) {
+		const params = new URLSearchParams({
+			sort: "-funding_ratio",
+			funding_status: "active",
+			limit,
+		});
+		return this.request(`/students?${params}`);
+	}
+
+	// Ranked full-text search; pass next_cursor back for the following page
+	async searchStudents(query, cursor = null) {
+		const params = new URLSearchParams({ q: query });
+		if (cursor) params.set("cursor", cursor);
+		return this.request(`/students/search?${params}`);
+	}
+
 	async getStudentById(id) {
 		return this.request(`/students/${id}`);
 	}
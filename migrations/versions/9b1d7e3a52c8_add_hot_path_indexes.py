@@ -0,0 +1,40 @@
+"""Add indexes for donation and verification hot paths
+
+Revision ID: 9b1d7e3a52c8
+Revises: d2f6b9a4c1e7
+Create Date: 2026-10-17 10:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b1d7e3a52c8'
+down_revision = 'd2f6b9a4c1e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('donations', schema=None) as batch_op:
+        batch_op.create_index('ix_donations_student_profile_id_created_at', ['student_profile_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_donations_donor_id_created_at', ['donor_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('student_profiles', schema=None) as batch_op:
+        batch_op.create_index('ix_student_profiles_is_verified_created_at', ['is_verified', 'created_at'], unique=False)
+
+    with op.batch_alter_table('user_student_supporters', schema=None) as batch_op:
+        batch_op.create_index('ix_user_student_supporters_student_profile_id_user_id', ['student_profile_id', 'user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user_student_supporters', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_student_supporters_student_profile_id_user_id')
+
+    with op.batch_alter_table('student_profiles', schema=None) as batch_op:
+        batch_op.drop_index('ix_student_profiles_is_verified_created_at')
+
+    with op.batch_alter_table('donations', schema=None) as batch_op:
+        batch_op.drop_index('ix_donations_donor_id_created_at')
+        batch_op.drop_index('ix_donations_student_profile_id_created_at')
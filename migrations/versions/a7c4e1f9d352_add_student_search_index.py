@@ -0,0 +1,88 @@
+"""Add full-text search index over student profiles
+
+Revision ID: a7c4e1f9d352
+Revises: f3b8d2e6a915
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c4e1f9d352'
+down_revision = 'f3b8d2e6a915'
+branch_labels = None
+depends_on = None
+
+POSTGRES_VECTOR = """
+    setweight(to_tsvector('english', coalesce({row}full_name, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({row}school_name, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({row}story, '')), 'C')
+"""
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS student_profiles_fts USING fts5(
+                full_name, school_name, story,
+                content='student_profiles', content_rowid='id',
+                tokenize='porter unicode61 remove_diacritics 2'
+            )
+        """)
+        op.execute("""
+            CREATE TRIGGER IF NOT EXISTS student_profiles_fts_insert AFTER INSERT ON student_profiles BEGIN
+                INSERT INTO student_profiles_fts(rowid, full_name, school_name, story)
+                VALUES (new.id, new.full_name, new.school_name, new.story);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER IF NOT EXISTS student_profiles_fts_delete AFTER DELETE ON student_profiles BEGIN
+                INSERT INTO student_profiles_fts(student_profiles_fts, rowid, full_name, school_name, story)
+                VALUES ('delete', old.id, old.full_name, old.school_name, old.story);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER IF NOT EXISTS student_profiles_fts_update
+            AFTER UPDATE OF full_name, school_name, story ON student_profiles BEGIN
+                INSERT INTO student_profiles_fts(student_profiles_fts, rowid, full_name, school_name, story)
+                VALUES ('delete', old.id, old.full_name, old.school_name, old.story);
+                INSERT INTO student_profiles_fts(rowid, full_name, school_name, story)
+                VALUES (new.id, new.full_name, new.school_name, new.story);
+            END
+        """)
+        op.execute("INSERT INTO student_profiles_fts(student_profiles_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.add_column('student_profiles', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+        op.create_index('ix_student_profiles_search_vector', 'student_profiles', ['search_vector'],
+                        postgresql_using='gin')
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION student_profiles_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {POSTGRES_VECTOR.format(row='NEW.')};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER student_profiles_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF full_name, school_name, story ON student_profiles
+            FOR EACH ROW EXECUTE FUNCTION student_profiles_search_vector_update()
+        """)
+        op.execute(f"UPDATE student_profiles SET search_vector = {POSTGRES_VECTOR.format(row='')}")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('insert', 'delete', 'update'):
+            op.execute(f'DROP TRIGGER IF EXISTS student_profiles_fts_{trigger}')
+        op.execute('DROP TABLE IF EXISTS student_profiles_fts')
+    elif dialect == 'postgresql':
+        op.execute('DROP TRIGGER IF EXISTS student_profiles_search_vector_trigger ON student_profiles')
+        op.execute('DROP FUNCTION IF EXISTS student_profiles_search_vector_update()')
+        op.drop_index('ix_student_profiles_search_vector', table_name='student_profiles')
+        op.drop_column('student_profiles', 'search_vector')
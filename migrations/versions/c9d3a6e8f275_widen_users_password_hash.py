@@ -0,0 +1,33 @@
+"""Widen users._password_hash to 500 characters
+
+Revision ID: c9d3a6e8f275
+Revises: b8e2f5c1d496
+Create Date: 2026-10-17 19:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9d3a6e8f275'
+down_revision = 'b8e2f5c1d496'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The model has always declared 500; scrypt hashes are 162 characters
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('_password_hash',
+               existing_type=sa.String(length=128),
+               type_=sa.String(length=500),
+               existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('_password_hash',
+               existing_type=sa.String(length=500),
+               type_=sa.String(length=128),
+               existing_nullable=False)
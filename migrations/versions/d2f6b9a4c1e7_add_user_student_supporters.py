@@ -0,0 +1,35 @@
+"""Add user_student_supporters table
+
+Revision ID: d2f6b9a4c1e7
+Revises: 4c60fe29e244
+Create Date: 2026-10-17 10:14:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f6b9a4c1e7'
+down_revision = '4c60fe29e244'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The initial migration predates the supporters table; databases built
+    # with db.create_all() already have it
+    if sa.inspect(op.get_bind()).has_table('user_student_supporters'):
+        return
+    op.create_table('user_student_supporters',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('student_profile_id', sa.Integer(), nullable=False),
+    sa.Column('followed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['student_profile_id'], ['student_profiles.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'student_profile_id')
+    )
+
+
+def downgrade():
+    op.drop_table('user_student_supporters')
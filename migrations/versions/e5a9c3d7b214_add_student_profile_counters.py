@@ -0,0 +1,47 @@
+"""Add follower and donation counters to student_profiles
+
+Revision ID: e5a9c3d7b214
+Revises: c4e8a1f06b3d
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a9c3d7b214'
+down_revision = 'c4e8a1f06b3d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('student_profiles', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('followers_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('donations_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('unique_donors_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from the source tables
+    op.execute("""
+        UPDATE student_profiles SET
+            followers_count = (
+                SELECT COUNT(*) FROM user_student_supporters
+                WHERE user_student_supporters.student_profile_id = student_profiles.id
+            ),
+            donations_count = (
+                SELECT COUNT(*) FROM donations
+                WHERE donations.student_profile_id = student_profiles.id
+            ),
+            unique_donors_count = (
+                SELECT COUNT(DISTINCT donor_id) FROM donations
+                WHERE donations.student_profile_id = student_profiles.id
+            )
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('student_profiles', schema=None) as batch_op:
+        batch_op.drop_column('unique_donors_count')
+        batch_op.drop_column('donations_count')
+        batch_op.drop_column('followers_count')
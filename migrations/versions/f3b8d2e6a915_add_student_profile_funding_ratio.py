@@ -0,0 +1,34 @@
+"""Add stored funding_ratio to student_profiles
+
+Revision ID: f3b8d2e6a915
+Revises: e5a9c3d7b214
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8d2e6a915'
+down_revision = 'e5a9c3d7b214'
+branch_labels = None
+depends_on = None
+
+FUNDING_RATIO = 'CASE WHEN fee_amount > 0 THEN COALESCE(amount_raised, 0) / fee_amount ELSE 0 END'
+
+
+def upgrade():
+    # SQLite cannot ALTER TABLE ADD a stored generated column, so let batch
+    # mode rebuild the table there
+    with op.batch_alter_table('student_profiles', schema=None, recreate='auto') as batch_op:
+        batch_op.add_column(sa.Column('funding_ratio', sa.Float(), sa.Computed(FUNDING_RATIO, persisted=True)))
+        batch_op.create_index(
+            'ix_student_profiles_is_verified_funding_ratio', ['is_verified', 'funding_ratio', 'id'], unique=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('student_profiles', schema=None) as batch_op:
+        batch_op.drop_index('ix_student_profiles_is_verified_funding_ratio')
+        batch_op.drop_column('funding_ratio')
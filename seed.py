@@ -13,6 +13,8 @@ Features:
 - Transaction safety with rollback on errors
 - Verification routine for seeded endpoints
 - JSON fixture export
+- Bulk mode for load-testing volumes (millions of rows)
+- Named dataset profiles generated from fixed seeds (reproducible benchmarks)
 
 Usage:
     python seed.py                           # Basic seeding
@@ -20,6 +22,8 @@ Usage:
     python seed.py --wipe                    # Clear seeded data
     python seed.py --verify                  # Test endpoints
     python seed.py --dry-run                 # Preview without writing
+    python seed.py --bulk --count-users 100000 --count-items 100000 --donations-per-student 10
+    python seed.py --profile launch-day      # Named, reproducible dataset
 
 Dependencies:
     pip install -r requirements-dev.txt
@@ -38,6 +42,8 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 import random
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 # Third-party imports
 try:
@@ -52,18 +58,20 @@ except ImportError as e:
 try:
     # Try package mode first (when run from project root)
     from server.app import create_app
-    from server.models import db, User, StudentProfile, Donation
+    from server.models import db, User, StudentProfile, Donation, password_hash_settings, user_student_supporters
     from server.config import Config
 except ImportError:
     try:
         # Try script mode (when run from server directory)
         from app import create_app
-        from models import db, User, StudentProfile, Donation
+        from models import db, User, StudentProfile, Donation, password_hash_settings, user_student_supporters
         from config import Config
     except ImportError as e:
         print(f"Could not import project modules: {e}")
         print("Make sure you're running from the project root or server directory")
         sys.exit(1)
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
 
 # Initialize Faker
 fake = Faker()
@@ -75,6 +83,77 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+ACADEMIC_LEVELS = ['primary', 'secondary', 'university']
+SCHOOL_NAMES = [
+    'Starehe Girls Centre', 'Mang\'u High School', 'Alliance Girls High School',
+    'Kagumo High School', 'Maseno School', 'Nairobi School',
+    'University of Nairobi', 'Kenyatta University', 'Strathmore University'
+]
+FEE_AMOUNTS = [25000, 35000, 45000, 55000, 75000]
+VERIFIED_RATIO = 0.75
+DONATION_MESSAGES = [
+    "Keep up the good work!",
+    "Education is the key to success",
+    "Proud to support your journey",
+    "All the best in your studies",
+    "You've got this!",
+    ""
+]
+
+# Named datasets for reproducible benchmark runs, generated in bulk mode.
+# Seeding an empty database with the same profile (and seed) always
+# produces the same rows, so results can be compared between runs.
+# popularity_skew is the Zipf exponent of donations and follows across
+# campaigns (0 = uniform); follows_per_donor sets the follower graph density.
+DATASET_PROFILES = {
+    'small': {
+        'count_users': 10,
+        'count_students': 5,
+        'donations_per_student': 5,
+        'popularity_skew': 0.0,
+        'follows_per_donor': 1,
+        'seed': 1
+    },
+    'launch-day': {
+        'count_users': 20000,
+        'count_students': 2000,
+        'donations_per_student': 15,
+        'popularity_skew': 0.8,
+        'follows_per_donor': 3,
+        'seed': 2024
+    },
+    '10x': {
+        'count_users': 200000,
+        'count_students': 20000,
+        'donations_per_student': 15,
+        'popularity_skew': 0.8,
+        'follows_per_donor': 3,
+        'seed': 10
+    }
+}
+
+
+def _fake_people(task: Tuple[str, int, int, int]) -> List[Tuple[str, ...]]:
+    """
+    Faker data for one bulk chunk (runs in a worker process).
+
+    Each chunk gets its own Faker seed, so its output does not depend on
+    which worker runs it or in what order.
+    """
+    kind, start, count, seed = task
+    chunk_fake = Faker()
+    chunk_fake.seed_instance(seed)
+    if kind == 'donor':
+        return [(f"{chunk_fake.name()} {start + i}",) for i in range(count)]
+    return [
+        (
+            f"{chunk_fake.name()} {start + i}",
+            chunk_fake.name(),
+            chunk_fake.paragraph(nb_sentences=5) + " " + chunk_fake.paragraph(nb_sentences=3)
+        )
+        for i in range(count)
+    ]
+
 
 class DatabaseSeeder:
     """Main seeder class handling all database operations."""
@@ -87,6 +166,7 @@ class DatabaseSeeder:
             'student_profiles': [],
             'donations': []
         }
+        self.bulk_stats = {}
         
     def detect_orm(self) -> str:
         """Detect the ORM being used."""
@@ -228,13 +308,6 @@ class DatabaseSeeder:
         
         # Create student users with profiles
         students = []
-        academic_levels = ['primary', 'secondary', 'university']
-        school_names = [
-            'Starehe Girls Centre', 'Mang\'u High School', 'Alliance Girls High School',
-            'Kagumo High School', 'Maseno School', 'Nairobi School',
-            'University of Nairobi', 'Kenyatta University', 'Strathmore University'
-        ]
-        
         for i in range(count_students):
             # Create student user
             student_user = self.get_or_create_user(
@@ -246,13 +319,13 @@ class DatabaseSeeder:
             
             if student_user:
                 # Create student profile
-                academic_level = random.choice(academic_levels)
-                fee_amount = random.choice([25000, 35000, 45000, 55000, 75000])
+                academic_level = random.choice(ACADEMIC_LEVELS)
+                fee_amount = random.choice(FEE_AMOUNTS)
                 
                 profile_data = {
                     'full_name': fake.name(),
                     'academic_level': academic_level,
-                    'school_name': random.choice(school_names),
+                    'school_name': random.choice(SCHOOL_NAMES),
                     'fee_amount': fee_amount,
                     'story': fake.paragraph(nb_sentences=5) + " " + fake.paragraph(nb_sentences=3),
                     'profile_image': f'https://picsum.photos/seed/student{i+1}/300/300',
@@ -313,6 +386,184 @@ class DatabaseSeeder:
                 db.session.rollback()
                 logger.error(f"❌ Error committing changes: {e}")
                 raise
+            
+            # Donations were inserted directly, so fill in the counter columns
+            drift = StudentProfile.reconcile_counters()
+            logger.info(f"Recomputed follower/donation counters for {len(drift)} profiles")
+    
+    def _fake_chunks(self, kind: str, numbers: List[int], chunk_size: int, workers: int, seed: int):
+        """Yield (numbers, faker rows) per chunk, generating Faker data in a process pool."""
+        chunks = [numbers[i:i + chunk_size] for i in range(0, len(numbers), chunk_size)]
+        tasks = [(kind, chunk[0], len(chunk), seed + chunk[0]) for chunk in chunks]
+        if workers <= 1:
+            for chunk, task in zip(chunks, tasks):
+                yield chunk, _fake_people(task)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from zip(chunks, pool.map(_fake_people, tasks))
+    
+    def _insert_rows(self, model, rows: List[Dict[str, Any]]) -> None:
+        """executemany INSERT of plain dicts, timed per table for the rows/sec report."""
+        if not rows:
+            return
+        table = getattr(model, '__table__', model)
+        started = time.perf_counter()
+        db.session.execute(insert(table), rows)
+        stats = self.bulk_stats.setdefault(table.name, {'rows': 0, 'seconds': 0.0})
+        stats['rows'] += len(rows)
+        stats['seconds'] += time.perf_counter() - started
+    
+    @staticmethod
+    def _popularity_weights(student_numbers: List[int], skew: float, seed: int) -> Dict[int, float]:
+        """
+        Relative popularity of each student, averaging 1.
+
+        Students get a random (seeded) rank; a rank's weight falls off as
+        rank ** -skew, so a few campaigns draw most donations and follows.
+        """
+        ranks = list(range(1, len(student_numbers) + 1))
+        random.Random(seed).shuffle(ranks)
+        weights = [rank ** -skew for rank in ranks]
+        scale = len(weights) / sum(weights) if weights else 0
+        return {n: weight * scale for n, weight in zip(student_numbers, weights)}
+    
+    def generate_bulk_data(self, count_users: int, count_students: int, donations_per_student: int = 5,
+                           chunk_size: int = 5000, workers: Optional[int] = None,
+                           seed: Optional[int] = None, popularity_skew: float = 0.0,
+                           follows_per_donor: float = 0.0) -> None:
+        """
+        Generate load-testing volumes of data with chunked multi-row inserts.
+
+        Every generated account shares one pre-computed password hash, and
+        existing seeded rows are found with one set-based query up front, so
+        re-running only fills in what is missing. Each chunk is committed on
+        its own; an interrupted run resumes where it stopped.
+        """
+        workers = workers or os.cpu_count() or 1
+        seed = random.randrange(2 ** 31) if seed is None else seed
+        rng = random.Random(seed)
+        donor_numbers = list(range(1, max(0, count_users - 2) + 1))
+        student_numbers = list(range(1, count_students + 1))
+        popularity = self._popularity_weights(student_numbers, popularity_skew, seed)
+        
+        if self.dry_run:
+            logger.info(f"[DRY RUN] Would bulk create up to {len(donor_numbers)} donors, "
+                        f"{len(student_numbers)} students and ~{donations_per_student} donations per verified student")
+            return
+        
+        started = time.perf_counter()
+        for email, username, role in [("test+admin@example.com", "Test Admin", "admin"),
+                                      ("test+user@example.com", "Test User", "donor")]:
+            self.get_or_create_user(email=email, username=username, role=role, password="Password123!")
+        db.session.commit()
+        
+        method, salt_length = password_hash_settings()
+        password_hash = generate_password_hash("Password123!", method=method, salt_length=salt_length)
+        existing_emails = {email for (email,) in db.session.query(User.email).filter(User.email.like('%@example.com'))}
+        profiled_emails = {email for (email,) in db.session.query(User.email).join(StudentProfile, StudentProfile.user_id == User.id)}
+        now = datetime.utcnow()
+        
+        # Donors
+        missing = [n for n in donor_numbers if f"donor{n}@example.com" not in existing_emails]
+        logger.info(f"Bulk creating {len(missing)} donors ({len(donor_numbers) - len(missing)} already exist)...")
+        for numbers, people in self._fake_chunks('donor', missing, chunk_size, workers, seed):
+            self._insert_rows(User, [
+                {'username': username, 'email': f"donor{n}@example.com", '_password_hash': password_hash,
+                 'role': 'donor', 'created_at': now}
+                for n, (username,) in zip(numbers, people)
+            ])
+            db.session.commit()
+        
+        # Only donors may donate or follow (admins are rejected by the API)
+        donor_ids = [user_id for (user_id,) in db.session.query(User.id).filter(
+            User.role == 'donor'
+        ).order_by(User.id)]
+        if not donor_ids:
+            raise ValueError("Bulk seeding needs at least one donor account")
+        
+        # Students, their profiles and donations
+        missing = [n for n in student_numbers if f"student{n}@example.com" not in profiled_emails]
+        logger.info(f"Bulk creating {len(missing)} student profiles ({len(student_numbers) - len(missing)} already exist)...")
+        for numbers, people in self._fake_chunks('student', missing, chunk_size, workers, seed + 10 ** 9):
+            emails = [f"student{n}@example.com" for n in numbers]
+            self._insert_rows(User, [
+                {'username': username, 'email': email, '_password_hash': password_hash,
+                 'role': 'student', 'created_at': now}
+                for email, (username, _, _) in zip(emails, people) if email not in existing_emails
+            ])
+            user_ids = dict(db.session.query(User.email, User.id).filter(User.email.in_(emails)))
+            
+            profiles = []
+            planned = {}
+            followers = {}
+            for n, email, (_, full_name, story) in zip(numbers, emails, people):
+                fee_amount = rng.choice(FEE_AMOUNTS)
+                is_verified = rng.random() < VERIFIED_RATIO
+                amounts = []
+                follower_ids = []
+                if is_verified:
+                    expected = donations_per_student * popularity[n]
+                    # Not capped at the fee: popular campaigns overshoot, as they can via the API
+                    amounts = [
+                        (rng.choice(donor_ids), rng.choice([100, 250, 500, 1000, 2500, 5000]))
+                        for _ in range(max(1, int(expected * rng.uniform(0.5, 1.5) + rng.random())))
+                    ]
+                    expected = follows_per_donor * len(donor_ids) / (count_students * VERIFIED_RATIO) * popularity[n]
+                    follower_count = min(len(donor_ids), int(expected * rng.uniform(0.5, 1.5) + rng.random()))
+                    follower_ids = rng.sample(donor_ids, follower_count)
+                planned[user_ids[email]] = amounts
+                followers[user_ids[email]] = follower_ids
+                profiles.append({
+                    'user_id': user_ids[email],
+                    'full_name': full_name,
+                    'academic_level': rng.choice(ACADEMIC_LEVELS),
+                    'school_name': rng.choice(SCHOOL_NAMES),
+                    'fee_amount': fee_amount,
+                    'amount_raised': sum(amount for _, amount in amounts),
+                    'followers_count': len(follower_ids),
+                    'donations_count': len(amounts),
+                    'unique_donors_count': len({donor_id for donor_id, _ in amounts}),
+                    'story': story,
+                    'profile_image': f'https://picsum.photos/seed/student{n}/300/300',
+                    'is_verified': is_verified,
+                    'created_at': now,
+                    'updated_at': now
+                })
+            self._insert_rows(StudentProfile, profiles)
+            
+            profile_ids = db.session.query(StudentProfile.user_id, StudentProfile.id).filter(
+                StudentProfile.user_id.in_(list(planned))
+            ).order_by(StudentProfile.id).all()
+            donations = [
+                {
+                    'donor_id': donor_id,
+                    'student_profile_id': profile_id,
+                    'amount': amount,
+                    'is_anonymous': rng.random() < 0.5,
+                    'message': rng.choice(DONATION_MESSAGES),
+                    'payment_method': rng.choice(['mpesa', 'card', 'bank']),
+                    'created_at': now - timedelta(seconds=rng.randint(0, 30 * 24 * 3600))
+                }
+                for user_id, profile_id in profile_ids
+                for donor_id, amount in planned[user_id]
+            ]
+            for start in range(0, len(donations), chunk_size):
+                self._insert_rows(Donation, donations[start:start + chunk_size])
+            follows = [
+                {'user_id': follower_id, 'student_profile_id': profile_id, 'followed_at': now}
+                for user_id, profile_id in profile_ids
+                for follower_id in followers[user_id]
+            ]
+            for start in range(0, len(follows), chunk_size):
+                self._insert_rows(user_student_supporters, follows[start:start + chunk_size])
+            StudentProfile.bump_catalog_version()
+            db.session.commit()
+            logger.info(f"  {numbers[-1]}/{count_students} students")
+        
+        self.bulk_stats['total'] = {
+            'rows': sum(stats['rows'] for stats in self.bulk_stats.values()),
+            'seconds': time.perf_counter() - started
+        }
     
     def wipe_seeded_data(self, force: bool = False) -> None:
         """Remove seeded data (with confirmation unless --force)."""
@@ -328,6 +579,7 @@ class DatabaseSeeder:
             # Delete in reverse dependency order
             Donation.query.delete()
             StudentProfile.query.delete()
+            StudentProfile.bump_catalog_version()
             User.query.delete()
             
             db.session.commit()
@@ -441,6 +693,10 @@ def print_summary(seeder: DatabaseSeeder) -> None:
     
     if seeder.dry_run:
         print("📋 DRY RUN - No data was actually written")
+    elif seeder.bulk_stats:
+        for table, stats in seeder.bulk_stats.items():
+            rate = stats['rows'] / stats['seconds'] if stats['seconds'] else 0
+            print(f"📦 {table}: {stats['rows']:,} rows in {stats['seconds']:.1f}s ({rate:,.0f} rows/s)")
     else:
         print(f"👥 Users created: {len(seeder.created_records['users'])}")
         print(f"🎓 Student profiles: {len(seeder.created_records['student_profiles'])}")
@@ -478,13 +734,28 @@ Examples:
   python seed.py --verify                  # Test endpoints
   python seed.py --dry-run                 # Preview without writing
   python seed.py --env-file .env.prod      # Use custom env file
+  python seed.py --bulk --count-users 100000 --count-items 100000 --donations-per-student 10
+  python seed.py --profile launch-day      # Named, reproducible dataset
+  python seed.py --profile small --seed 7  # Same shape, different data
         """
     )
     
-    parser.add_argument('--count-users', type=int, default=10,
+    parser.add_argument('--profile', choices=sorted(DATASET_PROFILES),
+                       help='Named dataset profile; explicit counts below override its values')
+    parser.add_argument('--seed', type=int,
+                       help="Random seed (default: the profile's seed, else unseeded)")
+    parser.add_argument('--count-users', type=int,
                        help='Number of users to create (default: 10)')
-    parser.add_argument('--count-items', type=int, default=5,
+    parser.add_argument('--count-items', type=int,
                        help='Number of student profiles to create (default: 5)')
+    parser.add_argument('--bulk', action='store_true',
+                       help='Load-testing volumes: chunked multi-row inserts, one shared password hash')
+    parser.add_argument('--donations-per-student', type=int,
+                       help='Average donations per verified student in --bulk mode (default: 5)')
+    parser.add_argument('--chunk-size', type=int, default=5000,
+                       help='Rows per INSERT batch in --bulk mode (default: 5000)')
+    parser.add_argument('--workers', type=int,
+                       help='Faker worker processes in --bulk mode (default: CPU count)')
     parser.add_argument('--env-file', type=str,
                        help='Path to .env file to load')
     parser.add_argument('--wipe', action='store_true',
@@ -506,6 +777,24 @@ Examples:
     # Load environment file if specified
     load_env_file(args.env_file)
     
+    # Explicit options win over the profile, which wins over the defaults
+    profile = dict(DATASET_PROFILES[args.profile]) if args.profile else {
+        'count_users': 10,
+        'count_students': 5,
+        'donations_per_student': 5,
+        'popularity_skew': 0.0,
+        'follows_per_donor': 0,
+        'seed': None
+    }
+    for key, value in [('count_users', args.count_users), ('count_students', args.count_items),
+                       ('donations_per_student', args.donations_per_student), ('seed', args.seed)]:
+        if value is not None:
+            profile[key] = value
+    if profile['seed'] is not None:
+        random.seed(profile['seed'])
+        fake.seed_instance(profile['seed'])
+        logger.info(f"Dataset: {args.profile or 'custom'} (seed {profile['seed']})")
+    
     # Create Flask app
     app = create_app()
     
@@ -515,11 +804,23 @@ Examples:
         try:
             if args.wipe:
                 seeder.wipe_seeded_data(force=args.force)
+            elif args.bulk or args.profile:
+                seeder.generate_bulk_data(
+                    count_users=profile['count_users'],
+                    count_students=profile['count_students'],
+                    donations_per_student=profile['donations_per_student'],
+                    chunk_size=args.chunk_size,
+                    workers=args.workers,
+                    seed=profile['seed'],
+                    popularity_skew=profile['popularity_skew'],
+                    follows_per_donor=profile['follows_per_donor']
+                )
+                print_summary(seeder)
             else:
                 # Generate data
                 seeder.generate_realistic_data(
-                    count_users=args.count_users,
-                    count_students=args.count_items
+                    count_users=profile['count_users'],
+                    count_students=profile['count_students']
                 )
                 
                 # Export fixtures
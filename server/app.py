@@ -1,4 +1,5 @@
 # server/app.py
+import click
 from flask import Flask, session
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
@@ -8,7 +9,15 @@ import os
 # Support both package and script run modes for imports
 try:
     from .config import Config
-    from .models import db
+    from .db_config import configure_engines
+    from .models import db, StudentProfile, User
+    from .utils.cache import init_catalog_cache
+    from .utils.hashing import init_password_hasher
+    from .utils.metrics import init_metrics
+    from .utils.query_stats import init_query_stats
+    from .utils.replica import init_read_replica
+    from .utils.search import rebuild_search_index
+    from .utils.sessions import init_session_store
     from .routes.auth import auth_bp
     from .routes.students import student_bp
     from .routes.donations import donation_bp
@@ -16,7 +25,15 @@ try:
     from .routes.supporters import supporters_bp
 except ImportError:
     from config import Config
-    from models import db
+    from db_config import configure_engines
+    from models import db, StudentProfile, User
+    from utils.cache import init_catalog_cache
+    from utils.hashing import init_password_hasher
+    from utils.metrics import init_metrics
+    from utils.query_stats import init_query_stats
+    from utils.replica import init_read_replica
+    from utils.search import rebuild_search_index
+    from utils.sessions import init_session_store
     from routes.auth import auth_bp
     from routes.students import student_bp
     from routes.donations import donation_bp
@@ -29,7 +46,14 @@ def create_app():
     
     # Initialize extensions
     db.init_app(app)
+    configure_engines(app, db)
     migrate = Migrate(app, db)
+    init_catalog_cache(app)
+    init_password_hasher(app)
+    init_session_store(app, db, User)
+    init_read_replica(app, db)
+    init_query_stats(app)
+    init_metrics(app, db)
     
     # Configure CORS - CRITICAL for frontend connection
     # Allow both localhost (development) and production origins
@@ -53,6 +77,22 @@ def create_app():
     app.register_blueprint(admin_bp)
     app.register_blueprint(supporters_bp)
     
+    @app.cli.command('reconcile-counters')
+    @click.option('--dry-run', is_flag=True, help='Report drift without fixing it')
+    def reconcile_counters(dry_run):
+        """Recompute student follower/donation counters and report drift"""
+        drift = StudentProfile.reconcile_counters(apply=not dry_run)
+        for student_id, columns in sorted(drift.items()):
+            changes = ', '.join(f'{column} {stored} -> {actual}' for column, (stored, actual) in columns.items())
+            click.echo(f'student {student_id}: {changes}')
+        click.echo(f"{len(drift)} profile(s) {'drifted' if dry_run else 'reconciled'}")
+    
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Reinstall the student search index and triggers and rebuild it"""
+        count = rebuild_search_index(db)
+        click.echo(f'Search index rebuilt for {count} student profile(s)')
+    
     # Test route
     @app.route('/api/test')
     def test():
@@ -26,8 +26,85 @@ class Config:
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Optional read replica. GET/HEAD requests to READ_REPLICA_BLUEPRINTS read
+    # from it, except for clients that wrote within READ_YOUR_WRITES_SECONDS
+    # (see utils/replica). Any URL SQLAlchemy accepts, e.g. a second SQLite file.
+    replica_url = os.environ.get('DATABASE_REPLICA_URL')
+    if replica_url and replica_url.startswith('postgresql://'):
+        replica_url = replica_url.replace('postgresql://', 'postgresql+psycopg://', 1)
+    SQLALCHEMY_BINDS = {'replica': replica_url} if replica_url else {}
+    READ_REPLICA_BLUEPRINTS = tuple(
+        name.strip() for name in os.environ.get('READ_REPLICA_BLUEPRINTS', 'students,supporters,admin').split(',')
+        if name.strip()
+    )
+    READ_YOUR_WRITES_SECONDS = float(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
+    
+    # Engine options. Server databases get a sized, pre-pinged connection
+    # pool; SQLite gets per-connection pragmas instead (see db_config), which
+    # let readers run alongside a writer and make writers wait for the lock
+    # rather than fail with "database is locked".
+    if SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+    else:
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+            'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+            'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 300)),
+            'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+        }
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        # Negative values are KiB: 64 MiB of page cache per connection
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64000))
+    }
+    
+    # Seconds the admin dashboard statistics may be served from cache
+    ADMIN_STATS_CACHE_TTL = int(os.environ.get('ADMIN_STATS_CACHE_TTL', 30))
+    
+    # Serialized student catalog cache: 'memory' (per worker) or 'sqlite'
+    # (a local file shared by all workers on the host)
+    CATALOG_CACHE_BACKEND = os.environ.get('CATALOG_CACHE_BACKEND', 'memory')
+    CATALOG_CACHE_PATH = os.environ.get('CATALOG_CACHE_PATH') or os.path.join(basedir, 'instance', 'catalog_cache.db')
+    CATALOG_CACHE_TTL = int(os.environ.get('CATALOG_CACHE_TTL', 60))
+    CATALOG_CACHE_MAX_ENTRIES = int(os.environ.get('CATALOG_CACHE_MAX_ENTRIES', 1024))
+    # Number of shuffle orders visitors are spread across (0 = one per visitor)
+    CATALOG_SHUFFLE_SEEDS = int(os.environ.get('CATALOG_SHUFFLE_SEEDS', 16))
+    
+    # Password hashing: any werkzeug method string, including its cost, e.g.
+    # 'pbkdf2:sha256:600000' or 'scrypt:32768:8:1'. Existing hashes made with
+    # other settings are upgraded on the user's next successful login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_SALT_LENGTH = int(os.environ.get('PASSWORD_SALT_LENGTH', 16))
+    # Hashing runs on a per-worker thread pool; beyond PASSWORD_HASH_MAX_PENDING
+    # queued or running hashes, auth requests get an immediate 503
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 32))
+    
+    # SQL instrumentation: statements slower than SQL_SLOW_QUERY_MS are logged;
+    # X-Query-* headers default to on in debug only, per-request JSON log
+    # lines (SQL_STATS_LOG) are written outside debug
+    SQL_SLOW_QUERY_MS = float(os.environ.get('SQL_SLOW_QUERY_MS', 200))
+    SQL_STATS_HEADERS = {'true': True, 'false': False}.get(os.environ.get('SQL_STATS_HEADERS', '').lower())
+    SQL_STATS_LOG = os.environ.get('SQL_STATS_LOG', 'true').lower() == 'true'
+    SQL_STATS_TOP_N = int(os.environ.get('SQL_STATS_TOP_N', 5))
+    
+    # If set, GET /metrics requires 'Authorization: Bearer <METRICS_TOKEN>'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
     # Session config
-    SESSION_TYPE = 'filesystem'
+    # 'cookie' (Flask signed cookies), or a server-side store: 'memory',
+    # 'sqlite' (file shared by workers on a host) or 'redis'. Server-side
+    # sessions cache the user's identity so auth checks skip the database.
+    SESSION_TYPE = os.environ.get('SESSION_TYPE', 'cookie')
+    SESSION_FILE_PATH = os.environ.get('SESSION_FILE_PATH') or os.path.join(basedir, 'instance', 'sessions.db')
+    SESSION_REDIS_URL = os.environ.get('SESSION_REDIS_URL', 'redis://localhost:6379/0')
+    # Past this many stored sessions, expired ones are swept out; live
+    # sessions are never evicted
+    SESSION_MAX_ENTRIES = int(os.environ.get('SESSION_MAX_ENTRIES', 10000))
     PERMANENT_SESSION_LIFETIME = 86400 
     
     # Production session settings
@@ -2,7 +2,7 @@
 Database configuration with fallback handling for different environments.
 """
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.engine import Engine
 
 def get_database_url():
@@ -52,6 +52,26 @@ def create_database_engine():
         print(f"❌ Database connection failed: {e}")
         raise e
 
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run the given PRAGMAs on every new connection of a SQLite engine."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+def configure_engines(app, db):
+    """Apply the app's SQLITE_PRAGMAS to each of its SQLite engines."""
+    with app.app_context():
+        for engine in db.engines.values():
+            apply_sqlite_pragmas(engine, app.config.get('SQLITE_PRAGMAS'))
+
 def test_database_connection():
     """Test the database connection."""
     try:
@@ -1,20 +1,71 @@
 # server/models.py
+from functools import lru_cache
+from flask import current_app, g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from sqlalchemy_serializer import SerializerMixin
 from sqlalchemy.orm import validates
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 
-db = SQLAlchemy()
+# Support both package and script run modes for imports
+try:
+    from .utils.replica import RoutingSession
+    from .utils.search import install_search_ddl
+except ImportError:
+    from utils.replica import RoutingSession
+    from utils.search import install_search_ddl
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Used outside an app context (e.g. scripts); apps read these from Config
+DEFAULT_PASSWORD_HASH_METHOD = 'pbkdf2:sha256:600000'
+DEFAULT_PASSWORD_SALT_LENGTH = 16
+
+def password_hash_settings():
+    """(method, salt_length) for new password hashes"""
+    if has_app_context():
+        return (
+            current_app.config.get('PASSWORD_HASH_METHOD', DEFAULT_PASSWORD_HASH_METHOD),
+            current_app.config.get('PASSWORD_SALT_LENGTH', DEFAULT_PASSWORD_SALT_LENGTH)
+        )
+    return DEFAULT_PASSWORD_HASH_METHOD, DEFAULT_PASSWORD_SALT_LENGTH
+
+def _password_hasher():
+    """The app's off-thread PasswordHasher, if one is configured"""
+    return current_app.extensions.get('password_hasher') if has_app_context() else None
+
+@lru_cache(maxsize=None)
+def _canonical_hash_method(method):
+    """
+    The method prefix werkzeug actually writes for a configured method,
+    e.g. 'scrypt' -> 'scrypt:32768:8:1'. Costs one hash per method.
+    """
+    return generate_password_hash('', method=method, salt_length=1).split('$', 1)[0]
 
 # Many-to-Many Association Table
 # User-StudentProfile Supporters (Donors following/supporting students)
 user_student_supporters = db.Table('user_student_supporters',
     db.Column('user_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
     db.Column('student_profile_id', db.Integer, db.ForeignKey('student_profiles.id'), primary_key=True),
-    db.Column('followed_at', db.DateTime, default=datetime.utcnow)
+    db.Column('followed_at', db.DateTime, default=datetime.utcnow),
+    # The primary key covers lookups by user; this covers the reverse side
+    # (follower counts and supporter lists per student)
+    db.Index('ix_user_student_supporters_student_profile_id_user_id', 'student_profile_id', 'user_id')
+)
+
+# Single-row counter bumped by every write to student_profiles; the catalog
+# ETag is built from it instead of aggregating over every profile
+catalog_state = db.Table('catalog_state',
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('version', db.Integer, nullable=False, default=0, server_default='0'),
+    db.Column('updated_at', db.DateTime)
 )
 
+@event.listens_for(catalog_state, 'after_create')
+def _insert_catalog_state_row(target, connection, **kw):
+    connection.execute(target.insert().values(id=1, version=0, updated_at=datetime.utcnow()))
+
 class User(db.Model, SerializerMixin):
     __tablename__ = 'users'
     
@@ -46,21 +97,29 @@ class User(db.Model, SerializerMixin):
     
     @password.setter
     def password(self, password):
-        # Use a shorter hash method that fits in 128 characters
-        self._password_hash = generate_password_hash(password, method='pbkdf2:sha256', salt_length=8)
+        method, salt_length = password_hash_settings()
+        hasher = _password_hasher()
+        if hasher:
+            self._password_hash = hasher.hash(password, method, salt_length)
+        else:
+            self._password_hash = generate_password_hash(password, method=method, salt_length=salt_length)
     
     def check_password(self, password):
+        hasher = _password_hasher()
         try:
-            # Try to verify with current hash
+            if hasher:
+                return hasher.verify(self._password_hash, password)
             return check_password_hash(self._password_hash, password)
-        except Exception:
-            # If verification fails, it might be due to truncated hash
-            # Try to verify with a newly generated hash for comparison
-            try:
-                new_hash = generate_password_hash(password, method='pbkdf2:sha256', salt_length=8)
-                return new_hash == self._password_hash
-            except Exception:
-                return False
+        except (ValueError, TypeError):
+            # Malformed or truncated hash; it can never match
+            return False
+    
+    def needs_rehash(self):
+        """True if the stored hash was made with other settings than the configured ones"""
+        method, salt_length = password_hash_settings()
+        stored_method, _, rest = (self._password_hash or '').partition('$')
+        stored_salt = rest.partition('$')[0]
+        return stored_method != _canonical_hash_method(method) or len(stored_salt) < salt_length
     
     # Validations
     @validates('email')
@@ -91,6 +150,10 @@ class User(db.Model, SerializerMixin):
 
 class StudentProfile(db.Model, SerializerMixin):
     __tablename__ = 'student_profiles'
+    __table_args__ = (
+        db.Index('ix_student_profiles_is_verified_created_at', 'is_verified', 'created_at'),
+        db.Index('ix_student_profiles_is_verified_funding_ratio', 'is_verified', 'funding_ratio', 'id'),
+    )
     
     # Columns
     id = db.Column(db.Integer, primary_key=True)
@@ -104,6 +167,20 @@ class StudentProfile(db.Model, SerializerMixin):
     profile_image = db.Column(db.String(200), default='/api/placeholder/300/300')
     is_verified = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped by every write that changes the serialized profile; used for ETags
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Maintained by the follow/donation routes in the same UPDATE as the
+    # version bump; reconcile_counters recomputes them from the source tables
+    followers_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    donations_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    unique_donors_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # amount_raised / fee_amount, stored by the database itself so every write
+    # path keeps it current; indexed for sorting/filtering by funding progress
+    funding_ratio = db.Column(db.Float, db.Computed(
+        'CASE WHEN fee_amount > 0 THEN COALESCE(amount_raised, 0) / fee_amount ELSE 0 END',
+        persisted=True
+    ))
     
     # Relationships
     user = db.relationship('User', back_populates='student_profile')
@@ -131,17 +208,23 @@ class StudentProfile(db.Model, SerializerMixin):
             raise ValueError('Story must be at least 50 characters')
         return story
     
-    def to_dict_full(self, current_user_id=None):
-        """Return full student profile with user info"""
-        # Get followers count
-        followers_count = self.supporters.count()
+    def to_dict_full(self, current_user_id=None, is_following=None):
+        """
+        Return full student profile with user info
         
+        is_following may be passed in precomputed (see to_dict_full_many);
+        otherwise it is queried for this profile.
+        """
         # Check if current user is following this student
-        is_following = False
-        if current_user_id:
-            current_user = User.query.get(current_user_id)
-            if current_user and current_user.role == 'donor':
-                is_following = current_user.supported_students.filter_by(id=self.id).first() is not None
+        if is_following is None:
+            is_following = False
+            if current_user_id:
+                # Reuse the request's cached user (see utils.decorators.get_current_user)
+                current_user = g.get('current_user') if has_app_context() else None
+                if current_user is None or current_user.id != current_user_id:
+                    current_user = User.query.get(current_user_id)
+                if current_user and current_user.role == 'donor':
+                    is_following = current_user.supported_students.filter_by(id=self.id).first() is not None
         
         return {
             'id': self.id,
@@ -157,16 +240,169 @@ class StudentProfile(db.Model, SerializerMixin):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'percentage_raised': (self.amount_raised / self.fee_amount * 100) if self.fee_amount > 0 else 0,
             'remaining_amount': self.fee_amount - self.amount_raised,
-            'followers_count': followers_count,
+            'followers_count': self.followers_count or 0,
             'is_following': is_following
         }
     
+    def to_dict_summary(self):
+        """Campaign progress for the profile owner's app shell; no extra queries"""
+        return {
+            'id': self.id,
+            'full_name': self.full_name,
+            'academic_level': self.academic_level,
+            'school_name': self.school_name,
+            'profile_image': self.profile_image,
+            'is_verified': self.is_verified,
+            'fee_amount': self.fee_amount,
+            'amount_raised': self.amount_raised,
+            'percentage_raised': (self.amount_raised / self.fee_amount * 100) if self.fee_amount > 0 else 0,
+            'remaining_amount': self.fee_amount - self.amount_raised,
+            'followers_count': self.followers_count or 0,
+            'donations_count': self.donations_count or 0,
+            'unique_donors_count': self.unique_donors_count or 0
+        }
+    
+    @classmethod
+    def bump_version(cls, student_id, changes=None):
+        """
+        Increment a profile's version and updated_at, together with any
+        extra column changes, in a single UPDATE statement
+        """
+        values = {cls.version: cls.version + 1, cls.updated_at: datetime.utcnow()}
+        values.update(changes or {})
+        cls.query.filter_by(id=student_id).update(values, synchronize_session=False)
+        cls.bump_catalog_version()
+    
+    @staticmethod
+    def bump_catalog_version(connection=None):
+        """Increment the catalog version, on connection or else the session"""
+        statement = catalog_state.update().where(catalog_state.c.id == 1).values(
+            version=catalog_state.c.version + 1,
+            updated_at=datetime.utcnow()
+        )
+        (connection or db.session).execute(statement)
+    
+    @staticmethod
+    def catalog_version():
+        """(version, last update) of the catalog; changes on any profile write"""
+        row = db.session.execute(
+            db.select(catalog_state.c.version, catalog_state.c.updated_at).where(catalog_state.c.id == 1)
+        ).first()
+        return tuple(row) if row else (0, None)
+    
+    @classmethod
+    def actual_counters(cls):
+        """Correlated subqueries computing each counter column from its source table"""
+        return {
+            cls.followers_count: db.select(db.func.count())
+                .where(user_student_supporters.c.student_profile_id == cls.id)
+                .scalar_subquery(),
+            cls.donations_count: db.select(db.func.count(Donation.id))
+                .where(Donation.student_profile_id == cls.id)
+                .scalar_subquery(),
+            cls.unique_donors_count: db.select(db.func.count(db.func.distinct(Donation.donor_id)))
+                .where(Donation.student_profile_id == cls.id)
+                .scalar_subquery()
+        }
+    
+    @classmethod
+    def reconcile_counters(cls, apply=True, chunk_size=1000):
+        """
+        Find profiles whose counter columns disagree with the follow and
+        donation tables, as {id: {column: (stored, actual)}}. With apply,
+        recompute them (and bump their version) in chunked UPDATEs; the
+        values are recomputed inside the UPDATE, so concurrent writes are
+        not overwritten with stale counts.
+        """
+        followers = db.select(
+            user_student_supporters.c.student_profile_id.label('id'),
+            db.func.count().label('n')
+        ).group_by(user_student_supporters.c.student_profile_id).subquery()
+        donations = db.select(
+            Donation.student_profile_id.label('id'),
+            db.func.count(Donation.id).label('n'),
+            db.func.count(db.func.distinct(Donation.donor_id)).label('donors')
+        ).group_by(Donation.student_profile_id).subquery()
+        
+        columns = [
+            (cls.followers_count, db.func.coalesce(followers.c.n, 0)),
+            (cls.donations_count, db.func.coalesce(donations.c.n, 0)),
+            (cls.unique_donors_count, db.func.coalesce(donations.c.donors, 0))
+        ]
+        rows = db.session.query(cls.id, *[c for pair in columns for c in pair]).outerjoin(
+            followers, followers.c.id == cls.id
+        ).outerjoin(
+            donations, donations.c.id == cls.id
+        ).filter(db.or_(*[stored != actual for stored, actual in columns])).all()
+        
+        drift = {}
+        for row in rows:
+            values = row[1:]
+            drift[row[0]] = {
+                column.key: (values[i * 2], values[i * 2 + 1])
+                for i, (column, _) in enumerate(columns)
+                if values[i * 2] != values[i * 2 + 1]
+            }
+        
+        if apply and drift:
+            ids = sorted(drift)
+            for start in range(0, len(ids), chunk_size):
+                db.session.execute(
+                    db.update(cls).where(cls.id.in_(ids[start:start + chunk_size])).values({
+                        cls.version: cls.version + 1,
+                        cls.updated_at: datetime.utcnow(),
+                        **cls.actual_counters()
+                    }).execution_options(synchronize_session=False)
+                )
+            cls.bump_catalog_version()
+            db.session.commit()
+        return drift
+    
+    @staticmethod
+    def followed_ids(current_user_id, ids):
+        """Which of the profile ids the given donor follows, in one query"""
+        if not current_user_id or not ids:
+            return set()
+        return {
+            student_id for (student_id,) in db.session.query(user_student_supporters.c.student_profile_id)
+            .join(User, User.id == user_student_supporters.c.user_id)
+            .filter(
+                user_student_supporters.c.user_id == current_user_id,
+                User.role == 'donor',
+                user_student_supporters.c.student_profile_id.in_(ids)
+            )
+        }
+    
+    @classmethod
+    def to_dict_full_many(cls, profiles, current_user_id=None):
+        """
+        Serialize a list of profiles like to_dict_full, resolving the
+        viewer's follow state in one query instead of per profile.
+        """
+        profiles = list(profiles)
+        followed_ids = cls.followed_ids(current_user_id, [p.id for p in profiles])
+        return [p.to_dict_full(current_user_id, is_following=p.id in followed_ids) for p in profiles]
+    
     def __repr__(self):
         return f'<StudentProfile {self.full_name}>'
 
 
+# Full-text index over name, school and story, maintained by triggers
+install_search_ddl(StudentProfile.__table__)
+
+# Profiles created or deleted through the ORM change the catalog too
+@event.listens_for(StudentProfile, 'after_insert')
+@event.listens_for(StudentProfile, 'after_delete')
+def _bump_catalog_on_profile_write(mapper, connection, target):
+    StudentProfile.bump_catalog_version(connection)
+
+
 class Donation(db.Model, SerializerMixin):
     __tablename__ = 'donations'
+    __table_args__ = (
+        db.Index('ix_donations_student_profile_id_created_at', 'student_profile_id', 'created_at'),
+        db.Index('ix_donations_donor_id_created_at', 'donor_id', 'created_at'),
+    )
     
     # Columns
     id = db.Column(db.Integer, primary_key=True)
@@ -212,5 +448,41 @@ class Donation(db.Model, SerializerMixin):
             }
         }
     
+    @classmethod
+    def details_query(cls):
+        """
+        Column-only query joining donor and student, for serializing many
+        donations without lazy-loading relationships row by row.
+        Rows are turned into dicts with details_row_to_dict.
+        """
+        return db.session.query(
+            cls.id, cls.amount, cls.is_anonymous, cls.message, cls.payment_method, cls.created_at,
+            User.username.label('donor_username'), User.email.label('donor_email'),
+            StudentProfile.id.label('student_id'),
+            StudentProfile.full_name.label('student_full_name'),
+            StudentProfile.school_name.label('student_school_name')
+        ).join(User, User.id == cls.donor_id).join(StudentProfile, StudentProfile.id == cls.student_profile_id)
+    
+    @staticmethod
+    def details_row_to_dict(row):
+        """Same shape as to_dict_with_details, built from a details_query row"""
+        return {
+            'id': row.id,
+            'amount': row.amount,
+            'is_anonymous': row.is_anonymous,
+            'message': row.message,
+            'payment_method': row.payment_method,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'donor': {
+                'username': row.donor_username if not row.is_anonymous else 'Anonymous',
+                'email': row.donor_email if not row.is_anonymous else None
+            },
+            'student': {
+                'id': row.student_id,
+                'full_name': row.student_full_name,
+                'school_name': row.student_school_name
+            }
+        }
+    
     def __repr__(self):
         return f'<Donation ${self.amount} to {self.student_profile_id}>'
\ No newline at end of file
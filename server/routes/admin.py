@@ -1,11 +1,23 @@
 # server/routes/admin_routes.py
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, Response, current_app, request, jsonify, session, stream_with_context
 try:
     from ..models import db, User, StudentProfile, Donation
     from ..utils.decorators import admin_required
+    from ..utils.cache import admin_stats_cache, get_catalog_cache, invalidate_admin_stats
+    from ..utils.pagination import decode_cursor, encode_cursor, parse_limit
+    from ..utils.query_stats import get_query_stats
+    from ..utils.replica import reading_from_primary
 except ImportError:
     from models import db, User, StudentProfile, Donation
     from utils.decorators import admin_required
+    from utils.cache import admin_stats_cache, get_catalog_cache, invalidate_admin_stats
+    from utils.pagination import decode_cursor, encode_cursor, parse_limit
+    from utils.query_stats import get_query_stats
+    from utils.replica import reading_from_primary
+import csv
+import io
+import json
+from datetime import datetime
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
@@ -14,9 +26,9 @@ admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 def get_pending_students():
     """Get all unverified student profiles"""
     try:
-        pending = StudentProfile.query.filter_by(is_verified=False).all()
+        pending = StudentProfile.query.filter_by(is_verified=False).order_by(StudentProfile.created_at).all()
         return jsonify({
-            'students': [s.to_dict_full() for s in pending],
+            'students': StudentProfile.to_dict_full_many(pending),
             'count': len(pending)
         }), 200
     except Exception as e:
@@ -41,7 +53,10 @@ def verify_student(id):
             student.is_verified = False
             message = 'Student rejected'
         
+        StudentProfile.bump_version(student.id)
         db.session.commit()
+        invalidate_admin_stats()
+        get_catalog_cache().touch_student(student.id, membership_changed=True)
         
         return jsonify({
             'message': message,
@@ -52,44 +67,204 @@ def verify_student(id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
+def compute_admin_stats():
+    """Compute the dashboard statistics in a single round trip"""
+    profile_stats = db.session.query(
+        db.func.count(StudentProfile.id).label('total_students'),
+        db.func.coalesce(
+            db.func.sum(db.case((StudentProfile.is_verified == True, 1), else_=0)), 0
+        ).label('verified_students')
+    ).subquery()
+    donor_stats = db.session.query(
+        db.func.count(User.id).label('total_donors')
+    ).filter(User.role == 'donor').subquery()
+    donation_stats = db.session.query(
+        db.func.count(Donation.id).label('total_donations'),
+        db.func.coalesce(db.func.sum(Donation.amount), 0).label('total_amount_raised')
+    ).subquery()
+    
+    # Each subquery yields exactly one row, so the cross join is one row too
+    row = (
+        db.session.query(profile_stats, donor_stats, donation_stats)
+        .select_from(profile_stats)
+        .join(donor_stats, db.true())
+        .join(donation_stats, db.true())
+        .one()
+    )
+    
+    return {
+        'total_students': row.total_students,
+        'verified_students': row.verified_students,
+        'pending_students': row.total_students - row.verified_students,
+        'total_donors': row.total_donors,
+        'total_donations': row.total_donations,
+        'total_amount_raised': row.total_amount_raised
+    }
+
 @admin_bp.route('/dashboard-stats', methods=['GET'])
 @admin_required
 def get_admin_stats():
     """Get admin dashboard statistics"""
     try:
-        total_students = StudentProfile.query.count()
-        verified_students = StudentProfile.query.filter_by(is_verified=True).count()
-        pending_students = StudentProfile.query.filter_by(is_verified=False).count()
-        total_donors = User.query.filter_by(role='donor').count()
-        total_donations = Donation.query.count()
-        total_amount_raised = db.session.query(db.func.sum(Donation.amount)).scalar() or 0
+        stats = admin_stats_cache.get('dashboard')
+        if stats is None:
+            # Cached for every admin, so never computed from a lagging replica
+            with reading_from_primary():
+                stats = compute_admin_stats()
+            admin_stats_cache.set('dashboard', stats, ttl=current_app.config['ADMIN_STATS_CACHE_TTL'])
         
-        return jsonify({
-            'total_students': total_students,
-            'verified_students': verified_students,
-            'pending_students': pending_students,
-            'total_donors': total_donors,
-            'total_donations': total_donations,
-            'total_amount_raised': total_amount_raised
-        }), 200
+        return jsonify(stats), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_CSV_COLUMNS = [
+    'id', 'created_at', 'amount', 'payment_method', 'is_anonymous', 'message',
+    'donor_username', 'donor_email', 'student_id', 'student_full_name', 'student_school_name'
+]
+
+def _donation_totals():
+    """(count, total amount) of all donations, computed in SQL"""
+    count, total = db.session.query(
+        db.func.count(Donation.id),
+        db.func.coalesce(db.func.sum(Donation.amount), 0)
+    ).one()
+    return count, total
+
 @admin_bp.route('/donations', methods=['GET'])
 @admin_required
 def get_all_donations():
-    """Get all donations (admin view)"""
+    """
+    Get all donations (admin view)
+    
+    With ?limit= or ?cursor= the donations are keyset-paginated newest
+    first; count and total_amount always cover every donation.
+    """
     try:
-        donations = Donation.query.order_by(Donation.created_at.desc()).all()
+        query = Donation.details_query().order_by(Donation.created_at.desc(), Donation.id.desc())
+        count, total_amount = _donation_totals()
+        
+        cursor = request.args.get('cursor')
+        if cursor is None and 'limit' not in request.args:
+            return jsonify({
+                'donations': [Donation.details_row_to_dict(row) for row in query],
+                'count': count,
+                'total_amount': total_amount
+            }), 200
+        
+        limit = parse_limit(request.args.get('limit'))
+        if cursor:
+            cursor_data = decode_cursor(cursor)
+            after_created_at = datetime.fromisoformat(cursor_data['created_at'])
+            after_id = int(cursor_data['id'])
+            query = query.filter(db.or_(
+                Donation.created_at < after_created_at,
+                db.and_(Donation.created_at == after_created_at, Donation.id < after_id)
+            ))
+        
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_cursor({'created_at': rows[-1].created_at.isoformat(), 'id': rows[-1].id})
+        
         return jsonify({
-            'donations': [d.to_dict_with_details() for d in donations],
-            'count': len(donations),
-            'total_amount': sum(d.amount for d in donations)
+            'donations': [Donation.details_row_to_dict(row) for row in rows],
+            'count': count,
+            'total_amount': total_amount,
+            'next_cursor': next_cursor,
+            'has_more': has_more
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+@admin_bp.route('/donations/export', methods=['GET'])
+@admin_required
+def export_donations():
+    """
+    Stream every donation as NDJSON (default) or CSV (?format=csv)
+    
+    Rows are fetched in chunks with yield_per and written out as they
+    arrive, so memory stays flat regardless of the number of donations.
+    """
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': "format must be 'ndjson' or 'csv'"}), 400
+    
+    query = (
+        Donation.details_query()
+        .order_by(Donation.created_at.desc(), Donation.id.desc())
+        .yield_per(EXPORT_CHUNK_SIZE)
+    )
+    
+    def generate_ndjson():
+        for row in query:
+            yield json.dumps(Donation.details_row_to_dict(row)) + '\n'
+    
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_CSV_COLUMNS)
+        for i, row in enumerate(query, 1):
+            writer.writerow([
+                row.id,
+                row.created_at.isoformat() if row.created_at else '',
+                row.amount,
+                row.payment_method,
+                row.is_anonymous,
+                row.message,
+                row.donor_username if not row.is_anonymous else 'Anonymous',
+                row.donor_email if not row.is_anonymous else '',
+                row.student_id,
+                row.student_full_name,
+                row.student_school_name
+            ])
+            if i % EXPORT_CHUNK_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    
+    if export_format == 'csv':
+        response = Response(stream_with_context(generate_csv()), mimetype='text/csv')
+        response.headers['Content-Disposition'] = 'attachment; filename=donations.csv'
+    else:
+        response = Response(stream_with_context(generate_ndjson()), mimetype='application/x-ndjson')
+    return response
+
+@admin_bp.route('/cache-stats', methods=['GET'])
+@admin_required
+def get_cache_stats():
+    """Hit/miss/eviction counters for the student catalog cache"""
+    return jsonify({'catalog': get_catalog_cache().stats()}), 200
+
+@admin_bp.route('/hashing-stats', methods=['GET'])
+@admin_required
+def get_hashing_stats():
+    """Password hashing pool latency, queue wait and rejection counters"""
+    return jsonify(current_app.extensions['password_hasher'].stats()), 200
+
+@admin_bp.route('/query-stats', methods=['GET'])
+@admin_required
+def get_query_stats_summary():
+    """Per-endpoint SQL query counts and DB time, plus the slowest statements seen"""
+    try:
+        limit = parse_limit(request.args.get('limit'), default=20)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(get_query_stats().snapshot(limit=limit)), 200
+
+@admin_bp.route('/query-stats', methods=['DELETE'])
+@admin_required
+def reset_query_stats():
+    """Start the query statistics afresh"""
+    get_query_stats().reset()
+    return jsonify({'message': 'Query statistics reset'}), 200
+
 @admin_bp.route('/users', methods=['GET'])
 @admin_required
 def get_all_users():
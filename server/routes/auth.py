@@ -2,12 +2,26 @@
 from flask import Blueprint, request, jsonify, session
 try:
     from ..models import db, User, StudentProfile
+    from ..utils.decorators import get_current_user
+    from ..utils.cache import invalidate_admin_stats
+    from ..utils.hashing import HasherBusy
+    from ..utils.sessions import remember_identity, revoke_user_sessions, session_identity_trusted
 except ImportError:
     from models import db, User, StudentProfile
+    from utils.decorators import get_current_user
+    from utils.cache import invalidate_admin_stats
+    from utils.hashing import HasherBusy
+    from utils.sessions import remember_identity, revoke_user_sessions, session_identity_trusted
 from werkzeug.security import generate_password_hash
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api')
 
+def _busy_response(error):
+    """Fast rejection when the password hashing queue is full"""
+    response = jsonify({'error': str(error)})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/signup', methods=['POST'])
 def signup():
     try:
@@ -30,10 +44,10 @@ def signup():
         
         db.session.add(new_user)
         db.session.commit()
+        invalidate_admin_stats()
         
         # Set session
-        session['user_id'] = new_user.id
-        session['user_role'] = new_user.role
+        remember_identity(new_user)
         session.permanent = True
         
         return jsonify({
@@ -41,6 +55,9 @@ def signup():
             'user': new_user.to_dict_basic()
         }), 201
         
+    except HasherBusy as e:
+        db.session.rollback()
+        return _busy_response(e)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
@@ -56,9 +73,17 @@ def login():
         if not user or not user.check_password(data['password']):
             return jsonify({'error': 'Invalid email or password'}), 401
         
+        # Upgrade hashes made with older hashing settings; under load the
+        # upgrade just waits for a later login
+        if user.needs_rehash():
+            try:
+                user.password = data['password']
+                db.session.commit()
+            except HasherBusy:
+                db.session.rollback()
+        
         # Set session
-        session['user_id'] = user.id
-        session['user_role'] = user.role
+        remember_identity(user)
         session.permanent = True
         
         # Return user data with student profile if exists
@@ -71,6 +96,8 @@ def login():
             'user': user_data
         }), 200
         
+    except HasherBusy as e:
+        return _busy_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -81,18 +108,48 @@ def logout():
 
 @auth_bp.route('/check-session', methods=['GET'])
 def check_session():
-    if 'user_id' in session:
-        user = User.query.get(session['user_id'])
-        if user:
-            user_data = user.to_dict_basic()
-            if user.role == 'student' and user.student_profile:
-                user_data['student_profile'] = user.student_profile.to_dict_full()
-            return jsonify({
-                'authenticated': True,
-                'user': user_data
-            }), 200
+    """
+    Report whether the request has a logged-in session
     
-    return jsonify({'authenticated': False}), 401
+    ?lite=true returns only identity and role (plus student_profile_id for
+    students) without serializing the student profile; the client fetches
+    that separately from /api/my-profile/summary when it needs it.
+    """
+    if 'user_id' not in session:
+        return jsonify({'authenticated': False}), 401
+    
+    lite = request.args.get('lite', 'false').lower() == 'true'
+    
+    # Server-side sessions hold the user's basic info; no query needed
+    if session_identity_trusted() and session.get('user'):
+        user_data = dict(session['user'])
+        student_profile_id = session.get('student_profile_id')
+        if lite:
+            if user_data['role'] == 'student':
+                user_data['student_profile_id'] = student_profile_id
+        elif student_profile_id:
+            profile = StudentProfile.query.get(student_profile_id)
+            if profile:
+                user_data['student_profile'] = profile.to_dict_full()
+        return jsonify({
+            'authenticated': True,
+            'user': user_data
+        }), 200
+    
+    user = get_current_user()
+    if not user:
+        return jsonify({'authenticated': False}), 401
+    
+    user_data = user.to_dict_basic()
+    if lite:
+        if user.role == 'student':
+            user_data['student_profile_id'] = db.session.query(StudentProfile.id).filter_by(user_id=user.id).scalar()
+    elif user.role == 'student' and user.student_profile:
+        user_data['student_profile'] = user.student_profile.to_dict_full()
+    return jsonify({
+        'authenticated': True,
+        'user': user_data
+    }), 200
 
 @auth_bp.route('/reset-password', methods=['POST'])
 def reset_password():
@@ -113,9 +170,13 @@ def reset_password():
         # Update password with new hash method
         user.password = new_password
         db.session.commit()
+        revoke_user_sessions(user.id)
         
         return jsonify({'message': 'Password reset successfully'}), 200
         
+    except HasherBusy as e:
+        db.session.rollback()
+        return _busy_response(e)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
\ No newline at end of file
@@ -1,49 +1,99 @@
 # server/routes/donation_routes.py
 from flask import Blueprint, request, jsonify, session
 try:
-    from ..models import db, User, StudentProfile, Donation
-    from ..utils.decorators import login_required
+    from ..models import db, StudentProfile, Donation
+    from ..utils.decorators import get_current_user, login_required
+    from ..utils.cache import get_catalog_cache, invalidate_admin_stats
+    from ..utils.pagination import decode_cursor, encode_cursor, parse_limit
 except ImportError:
-    from models import db, User, StudentProfile, Donation
-    from utils.decorators import login_required
+    from models import db, StudentProfile, Donation
+    from utils.decorators import get_current_user, login_required
+    from utils.cache import get_catalog_cache, invalidate_admin_stats
+    from utils.pagination import decode_cursor, encode_cursor, parse_limit
 from datetime import datetime
+from sqlalchemy import case, func
 
 donation_bp = Blueprint('donations', __name__, url_prefix='/api')
 
+def _touch_catalog(student, old_amount, new_amount):
+    """Invalidate cached catalog pages for a student whose amount_raised changed"""
+    # Crossing the fee moves the student between funding_status filters
+    was_funded = old_amount >= student.fee_amount
+    is_funded = new_amount >= student.fee_amount
+    get_catalog_cache().touch_student(student.id, membership_changed=was_funded != is_funded, funding_changed=True)
+
+def _lock_student(student_id):
+    """
+    Load a student profile and lock its row until commit (SELECT ... FOR
+    UPDATE; SQLite serializes writers anyway and ignores it), so donations
+    to one student and their cancellations apply one at a time
+    """
+    return StudentProfile.query.filter_by(id=student_id).with_for_update().populate_existing().first()
+
+def _adjust_student_totals(student_id, donor_id, amount, step):
+    """
+    Apply a donation (step=1) or its cancellation (step=-1) to a student's
+    amount_raised and donation counters in one atomic UPDATE.
+    
+    unique_donors_count only moves when this is the donor's one donation to
+    the student, so call this with the student locked (_lock_student), after
+    flushing a new donation and before deleting a cancelled one. Without the
+    lock, concurrent transactions under READ COMMITTED each count only their
+    own uncommitted donation.
+    """
+    donor_donations = db.select(func.count(Donation.id)).where(
+        Donation.student_profile_id == student_id,
+        Donation.donor_id == donor_id
+    ).scalar_subquery()
+    StudentProfile.bump_version(student_id, {
+        StudentProfile.amount_raised: func.coalesce(StudentProfile.amount_raised, 0) + step * amount,
+        StudentProfile.donations_count: StudentProfile.donations_count + step,
+        StudentProfile.unique_donors_count: StudentProfile.unique_donors_count + case(
+            (donor_donations == 1, step), else_=0
+        )
+    })
+
 @donation_bp.route('/donations', methods=['POST'])
 @login_required
 def create_donation():
     """Create a new donation"""
     try:
         data = request.get_json()
-        user = User.query.get(session['user_id'])
+        user = get_current_user()
         
         # Verify donor role
         if user.role != 'donor':
             return jsonify({'error': 'Only donors can make donations'}), 403
         
-        # Verify student exists and is verified
-        student = StudentProfile.query.get(data['student_id'])
+        # Verify student exists and is verified, locking it for the counters
+        student = _lock_student(data['student_id'])
         if not student:
             return jsonify({'error': 'Student not found'}), 404
         if not student.is_verified:
             return jsonify({'error': 'Student not verified'}), 400
         
+        amount = float(data['amount'])
+        
         # Create donation
         new_donation = Donation(
             donor_id=user.id,
             student_profile_id=student.id,
-            amount=float(data['amount']),
+            amount=amount,
             is_anonymous=data.get('anonymous', False),
             message=data.get('message', ''),
             payment_method=data.get('paymentMethod', 'mpesa')
         )
         
-        # Update student's amount_raised
-        student.amount_raised += float(data['amount'])
-        
         db.session.add(new_donation)
+        db.session.flush()
+        
+        # Update student's amount_raised and counters in SQL so concurrent
+        # donations can't overwrite each other's increments
+        old_amount = student.amount_raised or 0
+        _adjust_student_totals(student.id, user.id, amount, 1)
         db.session.commit()
+        invalidate_admin_stats()
+        _touch_catalog(student, old_amount, old_amount + amount)
         
         return jsonify({
             'message': 'Donation successful',
@@ -59,7 +109,7 @@ def create_donation():
 def get_my_donations():
     """Get logged-in user's donations"""
     try:
-        user = User.query.get(session['user_id'])
+        user = get_current_user()
         
         if user.role != 'donor':
             return jsonify({'error': 'Only donors can view donations'}), 403
@@ -78,33 +128,63 @@ def get_my_donations():
 @donation_bp.route('/my-students', methods=['GET'])
 @login_required
 def get_supported_students():
-    """Get list of students the donor has supported"""
+    """
+    Get list of students the donor has supported
+    
+    With ?limit= or ?cursor= the list is keyset-paginated by student id.
+    """
     try:
-        user = User.query.get(session['user_id'])
+        user = get_current_user()
         
         if user.role != 'donor':
             return jsonify({'error': 'Only donors can view this'}), 403
         
-        # Get unique students donated to
-        donated_student_ids = db.session.query(Donation.student_profile_id).filter_by(
-            donor_id=user.id
-        ).distinct().all()
-        
-        supported_students = []
-        for (student_id,) in donated_student_ids:
-            student = StudentProfile.query.get(student_id)
-            total_donated = sum(d.amount for d in student.donations if d.donor_id == user.id)
-            
-            supported_students.append({
-                **student.to_dict_full(),
+        # Per-student totals of this donor's donations, in one GROUP BY
+        my_totals = db.session.query(
+            Donation.student_profile_id.label('student_profile_id'),
+            func.sum(Donation.amount).label('my_total_donation'),
+            func.count(Donation.id).label('my_donation_count')
+        ).filter(Donation.donor_id == user.id).group_by(Donation.student_profile_id).subquery()
+        
+        query = db.session.query(
+            StudentProfile, my_totals.c.my_total_donation, my_totals.c.my_donation_count
+        ).join(my_totals, StudentProfile.id == my_totals.c.student_profile_id).order_by(StudentProfile.id)
+        
+        cursor = request.args.get('cursor')
+        paginated = cursor is not None or 'limit' in request.args
+        has_more = False
+        next_cursor = None
+        
+        if paginated:
+            limit = parse_limit(request.args.get('limit'))
+            if cursor:
+                query = query.filter(StudentProfile.id > int(decode_cursor(cursor)['after']))
+            rows = query.limit(limit + 1).all()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            if has_more:
+                next_cursor = encode_cursor({'after': rows[-1][0].id})
+        else:
+            rows = query.all()
+        
+        students = StudentProfile.to_dict_full_many([student for student, _, _ in rows])
+        supported_students = [
+            {
+                **student_data,
                 'my_total_donation': total_donated,
-                'my_donation_count': len([d for d in student.donations if d.donor_id == user.id])
-            })
+                'my_donation_count': donation_count
+            }
+            for student_data, (_, total_donated, donation_count) in zip(students, rows)
+        ]
         
-        return jsonify({
+        response = {
             'students': supported_students,
             'count': len(supported_students)
-        }), 200
+        }
+        if paginated:
+            response['next_cursor'] = next_cursor
+            response['has_more'] = has_more
+        return jsonify(response), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 400
@@ -127,12 +207,19 @@ def cancel_donation(id):
         if time_diff.total_seconds() > 86400:  # 24 hours
             return jsonify({'error': 'Cannot cancel after 24 hours'}), 400
         
-        # Update student's amount_raised
-        student = donation.student_profile
-        student.amount_raised -= donation.amount
+        # Update student's amount_raised and counters, with the student locked
+        # and the donation re-checked in case a concurrent cancel got there first
+        student = _lock_student(donation.student_profile_id)
+        if db.session.query(Donation.id).filter_by(id=donation.id).scalar() is None:
+            return jsonify({'error': 'Donation not found'}), 404
+        old_amount = student.amount_raised or 0
+        amount = donation.amount
+        _adjust_student_totals(student.id, donation.donor_id, amount, -1)
         
         db.session.delete(donation)
         db.session.commit()
+        invalidate_admin_stats()
+        _touch_catalog(student, old_amount, old_amount - amount)
         
         return jsonify({'message': 'Donation cancelled successfully'}), 200
         
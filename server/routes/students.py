@@ -1,18 +1,123 @@
 # server/routes/student_routes.py
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, current_app, request, jsonify, session
 try:
-    from ..models import db, User, StudentProfile
-    from ..utils.decorators import login_required, student_required
+    from ..models import db, User, StudentProfile, Donation
+    from ..utils.decorators import get_current_user, login_required, student_required
+    from ..utils.cache import get_catalog_cache, invalidate_admin_stats
+    from ..utils.http_cache import make_etag, not_modified, not_modified_response, set_validators
+    from ..utils.replica import reading_from_primary
+    from ..utils.search import query_tokens, search_student_ids
+    from ..utils.pagination import (
+        decode_cursor, encode_cursor, new_shuffle_seed, parse_limit, parse_shuffle_seed, shuffle_key
+    )
 except ImportError:
-    from models import db, User, StudentProfile
-    from utils.decorators import login_required, student_required
-from sqlalchemy import func
+    from models import db, User, StudentProfile, Donation
+    from utils.decorators import get_current_user, login_required, student_required
+    from utils.cache import get_catalog_cache, invalidate_admin_stats
+    from utils.http_cache import make_etag, not_modified, not_modified_response, set_validators
+    from utils.replica import reading_from_primary
+    from utils.search import query_tokens, search_student_ids
+    from utils.pagination import (
+        decode_cursor, encode_cursor, new_shuffle_seed, parse_limit, parse_shuffle_seed, shuffle_key
+    )
+from sqlalchemy import and_, or_
 
 student_bp = Blueprint('students', __name__, url_prefix='/api')
 
+# Plain cookie rather than the session, so anonymous catalog visits don't
+# create server-side sessions
+SHUFFLE_SEED_COOKIE = 'shuffle_seed'
+
+def _remember_shuffle_seed(response, seed):
+    """Set the visitor's shuffle seed cookie on response"""
+    response.set_cookie(
+        SHUFFLE_SEED_COOKIE,
+        str(seed),
+        max_age=current_app.permanent_session_lifetime,
+        httponly=True,
+        secure=current_app.config.get('SESSION_COOKIE_SECURE', False),
+        samesite=current_app.config.get('SESSION_COOKIE_SAMESITE')
+    )
+    return response
+
+def _apply_student_filters(query, args):
+    """Push the catalog filters from the query string into SQL"""
+    if args.get('academic_level'):
+        query = query.filter(StudentProfile.academic_level == args['academic_level'])
+    if args.get('school_name'):
+        query = query.filter(StudentProfile.school_name == args['school_name'])
+    
+    # Funding filters use the stored funding_ratio so they can be index ranges
+    funding_status = args.get('funding_status')
+    if funding_status == 'funded':
+        query = query.filter(StudentProfile.funding_ratio >= 1)
+    elif funding_status == 'active':
+        query = query.filter(StudentProfile.funding_ratio < 1)
+    elif funding_status:
+        raise ValueError("funding_status must be 'funded' or 'active'")
+    if args.get('min_ratio'):
+        query = query.filter(StudentProfile.funding_ratio >= float(args['min_ratio']))
+    if args.get('max_ratio'):
+        query = query.filter(StudentProfile.funding_ratio < float(args['max_ratio']))
+    
+    if args.get('min_fee'):
+        query = query.filter(StudentProfile.fee_amount >= float(args['min_fee']))
+    if args.get('max_fee'):
+        query = query.filter(StudentProfile.fee_amount <= float(args['max_fee']))
+    
+    return query
+
+def _load_catalog_page(query, sort_key, seed, cursor_data, paginated, descending=False):
+    """Run the catalog query and serialize it without any viewer state"""
+    if not paginated:
+        students = [row[0] for row in query.all()]
+        return {'students': StudentProfile.to_dict_full_many(students)}
+    
+    limit = parse_limit(request.args.get('limit'))
+    if 'after' in cursor_data:
+        after_key, after_id = cursor_data['after'][0], int(cursor_data['after'][1])
+        if not isinstance(after_key, (int, float)) or isinstance(after_key, bool):
+            raise ValueError('Invalid cursor')
+        if descending:
+            query = query.filter(or_(
+                sort_key < after_key,
+                and_(sort_key == after_key, StudentProfile.id < after_id)
+            ))
+        else:
+            query = query.filter(or_(
+                sort_key > after_key,
+                and_(sort_key == after_key, StudentProfile.id > after_id)
+            ))
+    
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    next_cursor = None
+    if has_more:
+        last_student, last_key = rows[-1]
+        next_cursor = encode_cursor({'seed': seed, 'after': [last_key, last_student.id]})
+    
+    return {
+        'students': StudentProfile.to_dict_full_many([s for s, _ in rows]),
+        'next_cursor': next_cursor,
+        'has_more': has_more
+    }
+
 @student_bp.route('/students', methods=['GET'])
 def get_all_students():
-    """Get all verified students (public endpoint)"""
+    """
+    Get verified students (public endpoint)
+    
+    Without ?limit= or ?cursor= the whole (filtered) catalog is returned.
+    With them, results are keyset-paginated and the response carries a
+    next_cursor to pass back for the following page.
+    
+    ?sort=funding_ratio / -funding_ratio orders by share of the fee raised
+    (e.g. ?sort=-funding_ratio&funding_status=active&limit=20 is the 20
+    students closest to their goal) instead of the default shuffle;
+    ?min_ratio= / ?max_ratio= filter on the same ratio.
+    """
     try:
         # Get query parameters for filtering
         verified_only = request.args.get('verified', 'true').lower() == 'true'
@@ -20,16 +125,132 @@ def get_all_students():
         query = StudentProfile.query
         if verified_only:
             query = query.filter_by(is_verified=True)
+        query = _apply_student_filters(query, request.args)
+        
+        cursor = request.args.get('cursor')
+        paginated = cursor is not None or 'limit' in request.args
+        cursor_data = decode_cursor(cursor) if cursor else {}
         
-        # Randomize order for fairness
-        students = query.order_by(func.random()).all()
+        sort = request.args.get('sort', 'shuffle')
+        descending = sort.startswith('-')
+        new_seed = None
+        if sort == 'shuffle':
+            # Shuffle for fairness with a per-visitor seed (kept in a cookie) so
+            # the order is stable across pages; a cursor carries its own seed.
+            # Seeds come from a small pool so visitors can share cached pages.
+            seed = cursor_data.get('seed')
+            if seed is None:
+                seed = parse_shuffle_seed(request.cookies.get(SHUFFLE_SEED_COOKIE))
+                if seed is None:
+                    seed = new_seed = new_shuffle_seed(current_app.config['CATALOG_SHUFFLE_SEEDS'])
+            sort_key = shuffle_key(StudentProfile.id, seed)
+        elif sort.lstrip('-') == 'funding_ratio':
+            seed = None
+            sort_key = StudentProfile.funding_ratio
+        else:
+            raise ValueError("sort must be 'shuffle', 'funding_ratio' or '-funding_ratio'")
+        
+        order_by = (sort_key.desc(), StudentProfile.id.desc()) if descending else (sort_key, StudentProfile.id)
+        query = query.add_columns(sort_key.label('sort_key')).order_by(*order_by)
         
         # Get current user ID if logged in
         current_user_id = session.get('user_id')
         
+        # Any profile write bumps the catalog version, so it validates
+        # every filter/page combination at once. It is read from the primary,
+        # like the cached pages below, and pages are cached under the version
+        # they were loaded at: a 304 for this version always matches the body
+        # a full GET would send.
+        with reading_from_primary():
+            catalog_version, last_modified = StudentProfile.catalog_version()
+        etag = make_etag('students', request.query_string, seed, current_user_id, catalog_version)
+        if not_modified(etag, last_modified):
+            response = not_modified_response(etag, last_modified)
+            if new_seed:
+                _remember_shuffle_seed(response, new_seed)
+            return response
+        
+        # Serialized pages are cached per filter/page/seed without the
+        # viewer's follow state, which is overlaid below. The catalog version
+        # is part of the key: the cache is per worker and only sees its own
+        # touches, so a write handled by another worker (or not yet touched)
+        # still retires every page loaded before it.
+        catalog_cache = get_catalog_cache()
+        by_funding = seed is None or any(request.args.get(name) for name in ('min_ratio', 'max_ratio'))
+        cache_params = {
+            'args': sorted(request.args.items(multi=True)),
+            'seed': seed,
+            'catalog_version': catalog_version
+        }
+        snapshot = catalog_cache.snapshot(cache_params, by_funding=by_funding)
+        page = catalog_cache.get_page(snapshot)
+        if page is None:
+            # Shared by every visitor, so never filled from a lagging replica
+            with reading_from_primary():
+                page = _load_catalog_page(query, sort_key, seed, cursor_data, paginated, descending)
+                # A write committed during the load may be in the page, which
+                # must then not be cached under the older version
+                unchanged = StudentProfile.catalog_version()[0] == catalog_version
+            if unchanged:
+                catalog_cache.set_page(snapshot, page)
+        
+        students = page['students']
+        followed_ids = StudentProfile.followed_ids(current_user_id, [s['id'] for s in students])
+        students = [dict(s, is_following=s['id'] in followed_ids) for s in students]
+        
+        body = {'students': students, 'count': len(students)}
+        if paginated:
+            body['next_cursor'] = page['next_cursor']
+            body['has_more'] = page['has_more']
+        response = set_validators(jsonify(body), etag, last_modified)
+        if new_seed:
+            _remember_shuffle_seed(response, new_seed)
+        return response, 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@student_bp.route('/students/search', methods=['GET'])
+def search_students():
+    """
+    Full-text search over verified students' names, schools and stories
+    
+    ?q= is required. Results come best match first, paginated with ?limit=
+    and ?cursor=, each with a search_rank and highlights: the HTML-escaped
+    name, school and a story snippet with <mark> around matches.
+    """
+    try:
+        query_text = request.args.get('q', '').strip()
+        if not query_tokens(query_text):
+            return jsonify({'error': 'Search query (q) is required'}), 400
+        
+        limit = parse_limit(request.args.get('limit'))
+        offset = 0
+        cursor = request.args.get('cursor')
+        if cursor:
+            cursor_data = decode_cursor(cursor)
+            offset = int(cursor_data.get('offset', 0))
+            if cursor_data.get('q') != query_text or offset < 0:
+                raise ValueError('Invalid cursor')
+        
+        matches = search_student_ids(db.session, query_text, limit + 1, offset)
+        has_more = len(matches) > limit
+        matches = matches[:limit]
+        
+        ids = [student_id for student_id, _, _ in matches]
+        profiles = {p.id: p for p in StudentProfile.query.filter(StudentProfile.id.in_(ids))} if ids else {}
+        ordered = [profiles[student_id] for student_id in ids if student_id in profiles]
+        students = StudentProfile.to_dict_full_many(ordered, session.get('user_id'))
+        
+        ranks = {student_id: (rank, highlights) for student_id, rank, highlights in matches}
+        for student in students:
+            student['search_rank'], student['highlights'] = ranks[student['id']]
+        
         return jsonify({
-            'students': [s.to_dict_full(current_user_id) for s in students],
-            'count': len(students)
+            'students': students,
+            'count': len(students),
+            'next_cursor': encode_cursor({'q': query_text, 'offset': offset + limit}) if has_more else None,
+            'has_more': has_more
         }), 200
         
     except Exception as e:
@@ -43,24 +264,36 @@ def get_student_by_id(id):
         if not student:
             return jsonify({'error': 'Student not found'}), 404
         
-        # Get recent donations for this student
-        recent_donations = []
-        for donation in student.donations[-5:]:  # Last 5 donations
-            recent_donations.append({
-                'amount': donation.amount,
-                'created_at': donation.created_at.isoformat(),
-                'is_anonymous': donation.is_anonymous,
-                'donor': donation.donor.username if not donation.is_anonymous else 'Anonymous'
-            })
-        
         # Get current user ID if logged in
         current_user_id = session.get('user_id')
         
+        etag = make_etag('student', student.id, student.version, current_user_id)
+        last_modified = student.updated_at or student.created_at
+        if not_modified(etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        # Get the 5 most recent donations, with donor usernames joined in
+        recent = db.session.query(
+            Donation.amount, Donation.created_at, Donation.is_anonymous, User.username
+        ).join(User, User.id == Donation.donor_id).filter(
+            Donation.student_profile_id == id
+        ).order_by(Donation.created_at.desc(), Donation.id.desc()).limit(5).all()
+        
+        recent_donations = [{
+            'amount': amount,
+            'created_at': created_at.isoformat() if created_at else None,
+            'is_anonymous': is_anonymous,
+            'donor': username if not is_anonymous else 'Anonymous'
+        } for amount, created_at, is_anonymous, username in recent]
+        
         student_data = student.to_dict_full(current_user_id)
         student_data['recent_donations'] = recent_donations
-        student_data['total_donors'] = len(student.donations)
+        # Maintained on write (see routes/donations.py)
+        student_data['total_donors'] = student.unique_donors_count
+        student_data['total_donations'] = student.donations_count
+        student_data['total_donated'] = student.amount_raised or 0
         
-        return jsonify(student_data), 200
+        return set_validators(jsonify(student_data), etag, last_modified), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 400
@@ -71,7 +304,7 @@ def create_student_profile():
     """Create student profile for logged-in student user"""
     try:
         # Check if user is a student
-        user = User.query.get(session['user_id'])
+        user = get_current_user()
         if user.role != 'student':
             return jsonify({'error': 'Only students can create profiles'}), 403
         
@@ -93,6 +326,9 @@ def create_student_profile():
         
         db.session.add(new_profile)
         db.session.commit()
+        invalidate_admin_stats()
+        get_catalog_cache().touch_student(new_profile.id, membership_changed=True)
+        session['student_profile_id'] = new_profile.id
         
         return jsonify({
             'message': 'Student profile created successfully',
@@ -113,7 +349,7 @@ def update_student_profile(id):
             return jsonify({'error': 'Student profile not found'}), 404
         
         # Check permission
-        user = User.query.get(session['user_id'])
+        user = get_current_user()
         if user.role != 'admin' and student.user_id != user.id:
             return jsonify({'error': 'Unauthorized'}), 403
         
@@ -133,7 +369,13 @@ def update_student_profile(id):
         if 'profile_image' in data:
             student.profile_image = data['profile_image']
         
+        StudentProfile.bump_version(student.id)
         db.session.commit()
+        # Edits to filtered fields can move the student between filtered pages
+        get_catalog_cache().touch_student(
+            student.id,
+            membership_changed=bool({'academic_level', 'school_name', 'fee_amount'} & set(data))
+        )
         
         return jsonify({
             'message': 'Profile updated successfully',
@@ -149,7 +391,7 @@ def update_student_profile(id):
 def get_my_profile():
     """Get logged-in student's profile"""
     try:
-        user = User.query.get(session['user_id'])
+        user = get_current_user()
         if user.role != 'student':
             return jsonify({'error': 'Not a student'}), 403
         
@@ -161,13 +403,42 @@ def get_my_profile():
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+@student_bp.route('/my-profile/summary', methods=['GET'])
+@login_required
+@student_required
+def get_my_profile_summary():
+    """
+    Lightweight summary of the logged-in student's profile
+    
+    One primary-key lookup; revalidated with an ETag built from the profile
+    version, so unchanged summaries come back as 304 Not Modified.
+    """
+    try:
+        profile_id = session.get('student_profile_id')
+        if profile_id:
+            profile = StudentProfile.query.get(profile_id)
+        else:
+            profile = StudentProfile.query.filter_by(user_id=session['user_id']).first()
+        if not profile:
+            return jsonify({'error': 'No profile found'}), 404
+        
+        etag = make_etag('profile-summary', profile.id, profile.version)
+        last_modified = profile.updated_at or profile.created_at
+        if not_modified(etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
+        return set_validators(jsonify(profile.to_dict_summary()), etag, last_modified), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
 @student_bp.route('/<int:student_id>/donations', methods=['GET'])
 @login_required
 def get_student_donations(student_id):
     """Get donations for a specific student"""
     try:
         # Check if the requesting user is the student or an admin
-        user = User.query.get(session['user_id'])
+        user = get_current_user()
         if user.role not in ['admin'] and (not user.student_profile or user.student_profile.id != student_id):
             return jsonify({'error': 'Unauthorized'}), 403
         
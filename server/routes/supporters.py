@@ -1,10 +1,12 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify
 try:
-    from ..models import db, User, StudentProfile
-    from ..utils.decorators import login_required, donor_required
+    from ..models import db, StudentProfile
+    from ..utils.decorators import get_current_user, login_required, donor_required
+    from ..utils.cache import get_catalog_cache
 except ImportError:
-    from models import db, User, StudentProfile
-    from utils.decorators import login_required, donor_required
+    from models import db, StudentProfile
+    from utils.decorators import get_current_user, login_required, donor_required
+    from utils.cache import get_catalog_cache
 
 supporters_bp = Blueprint('supporters', __name__)
 
@@ -15,7 +17,7 @@ def follow_student(student_id):
     """Follow a student"""
     try:
         # Get current user
-        current_user = User.query.get(session['user_id'])
+        current_user = get_current_user()
         
         # Get student profile
         student = StudentProfile.query.get(student_id)
@@ -28,7 +30,11 @@ def follow_student(student_id):
         
         # Add to supported students
         current_user.supported_students.append(student)
+        StudentProfile.bump_version(student.id, {
+            StudentProfile.followers_count: StudentProfile.followers_count + 1
+        })
         db.session.commit()
+        get_catalog_cache().touch_student(student.id)
         
         return jsonify({
             'message': f'Successfully following {student.full_name}',
@@ -46,7 +52,7 @@ def unfollow_student(student_id):
     """Unfollow a student"""
     try:
         # Get current user
-        current_user = User.query.get(session['user_id'])
+        current_user = get_current_user()
         
         # Get student profile
         student = StudentProfile.query.get(student_id)
@@ -59,7 +65,11 @@ def unfollow_student(student_id):
         
         # Remove from supported students
         current_user.supported_students.remove(student)
+        StudentProfile.bump_version(student.id, {
+            StudentProfile.followers_count: StudentProfile.followers_count - 1
+        })
         db.session.commit()
+        get_catalog_cache().touch_student(student.id)
         
         return jsonify({
             'message': f'Successfully unfollowed {student.full_name}',
@@ -77,16 +87,14 @@ def get_my_followed_students():
     """Get all students the current donor is following"""
     try:
         # Get current user
-        current_user = User.query.get(session['user_id'])
+        current_user = get_current_user()
         
         # Get followed students
         followed_students = current_user.supported_students.all()
         
-        students_data = []
-        for student in followed_students:
-            student_data = student.to_dict_full(current_user.id)
+        students_data = StudentProfile.to_dict_full_many(followed_students, current_user.id)
+        for student_data in students_data:
             student_data['is_following'] = True
-            students_data.append(student_data)
         
         return jsonify({
             'students': students_data,
@@ -133,7 +141,7 @@ def check_following_status(student_id):
     """Check if current user is following a specific student"""
     try:
         # Get current user
-        current_user = User.query.get(session['user_id'])
+        current_user = get_current_user()
         
         # Get student profile
         student = StudentProfile.query.get(student_id)
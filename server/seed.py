@@ -155,6 +155,9 @@ def seed_database():
         
         db.session.commit()
         
+        # Fill in the follower/donation counter columns
+        StudentProfile.reconcile_counters()
+        
         print("\n✅ Database seeded successfully!")
         print("\nTest Accounts:")
         print("Admin: admin@elimufund.com / password123")
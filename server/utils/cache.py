@@ -0,0 +1,368 @@
+"""
+Small caches.
+
+TTLCache and MemoryCacheBackend live per worker process, so every cached
+value also carries a TTL: a write handled by another worker is picked up
+once the entry expires. SQLiteCacheBackend keeps entries in a local file
+that all workers on a host share, so invalidations are seen everywhere.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+
+class TTLCache:
+    """Thread-safe dict whose entries expire after a time-to-live"""
+
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when key is None"""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+
+# Admin dashboard aggregates; invalidated by every write that changes them
+admin_stats_cache = TTLCache()
+
+
+def invalidate_admin_stats():
+    admin_stats_cache.invalidate()
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU cache with per-entry TTL.
+
+    Counters (see incr) are kept apart from the LRU entries and are never
+    evicted, since a lost counter would make stale entries look current.
+
+    With evict_live=False (session stores) entries are only dropped once
+    they expire: passing max_entries sweeps out the expired entries, and
+    the store grows rather than evict live ones.
+    """
+
+    def __init__(self, max_entries=1024, evict_live=True):
+        self.max_entries = max_entries
+        self.evict_live = evict_live
+        self._sweep_at = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            now = time.monotonic()
+            self._entries[key] = (value, now + ttl)
+            self._entries.move_to_end(key)
+            if len(self._entries) <= self._sweep_at:
+                return
+            if self.evict_live:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+                return
+            for expired in [k for k, (_, expires_at) in self._entries.items() if expires_at <= now]:
+                del self._entries[expired]
+            # Sweep again once the live entries have doubled, so sweeps stay
+            # amortized O(1) per set while the store is over size
+            self._sweep_at = max(self.max_entries, 2 * len(self._entries))
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, name):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+            return self._counters[name]
+
+    def get_counters(self, names):
+        with self._lock:
+            return [self._counters.get(name, 0) for name in names]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+class SQLiteCacheBackend:
+    """
+    Cache stored in a local SQLite file, shared by every worker on the host.
+
+    Values are stored as JSON. When the entry count passes max_entries
+    expired entries are deleted, then (unless evict_live=False) the least
+    recently written live ones. Hit/miss/eviction counts are per process.
+    """
+
+    def __init__(self, path, max_entries=10000, evict_live=True):
+        self.path = path
+        self.max_entries = max_entries
+        self.evict_live = evict_live
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, written_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_written_at ON cache_entries (written_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at ON cache_entries (expires_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS cache_counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, attr, amount=1):
+        with self._stats_lock:
+            setattr(self, attr, getattr(self, attr) + amount)
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        if row is None:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, written_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now + ttl, now)
+        )
+        overflow = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            overflow -= conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,)).rowcount
+        if overflow > 0 and self.evict_live:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE key IN "
+                "(SELECT key FROM cache_entries ORDER BY written_at LIMIT ?)", (overflow,)
+            )
+            self._count('evictions', overflow)
+
+    def delete(self, key):
+        self._connect().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def incr(self, name):
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO cache_counters (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,)
+        )
+        return conn.execute("SELECT value FROM cache_counters WHERE name = ?", (name,)).fetchone()[0]
+
+    def get_counters(self, names):
+        names = list(names)
+        values = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            values.update(self._connect().execute(
+                f"SELECT name, value FROM cache_counters WHERE name IN ({placeholders})", chunk
+            ).fetchall())
+        return [values.get(name, 0) for name in names]
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute("DELETE FROM cache_entries")
+        conn.execute("DELETE FROM cache_counters")
+
+    def stats(self):
+        entries = self._connect().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+
+class CatalogCache:
+    """
+    Cache of serialized student catalog pages, keyed by filters and page.
+
+    Cached profile dicts are viewer independent; callers overlay the
+    viewer's follow state. Each page remembers the touch stamp of every
+    student it contains, and touch_student() bumps that stamp on writes,
+    so only pages holding a touched student go stale. Writes that can move
+    a student in or out of a filtered set (verification, funding status or
+    filter field changes) bump the catalog generation instead, which
+    retires every page at once. Pages ordered or filtered by funding ratio
+    also depend on a funding generation, bumped whenever a student's
+    amount raised changes.
+    
+    Callers include the database's catalog version in the params, so a
+    write made through another worker (whose touches this cache never
+    sees) still moves readers to a fresh key. They take a snapshot() before
+    reading a page and pass it to get_page and set_page. Every touch also bumps a write sequence, and
+    set_page skips pages whose load overlapped a touch: such a page may
+    hold rows from before a write under stamps from after it.
+    """
+
+    GENERATION = 'catalog:generation'
+    FUNDING_GENERATION = 'catalog:funding-generation'
+    WRITE_SEQUENCE = 'catalog:write-sequence'
+
+    def __init__(self, backend, ttl=60):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale = 0
+        self.skipped = 0
+
+    @staticmethod
+    def _stamp_name(student_id):
+        return f'catalog:student:{student_id}'
+
+    def snapshot(self, params, by_funding=False):
+        """(page key, write sequence) for params; take it before loading the page"""
+        names = [self.WRITE_SEQUENCE, self.GENERATION]
+        if by_funding:
+            names.append(self.FUNDING_GENERATION)
+        sequence, *generations = self.backend.get_counters(names)
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+        return f"catalog:page:{'.'.join(str(value) for value in generations)}:{digest}", sequence
+
+    def get_page(self, snapshot):
+        """The cached page for a snapshot, or None if missing or stale"""
+        key, _ = snapshot
+        page = self.backend.get(key)
+        if page is None:
+            return None
+        ids = [student['id'] for student in page['students']]
+        if self.backend.get_counters([self._stamp_name(i) for i in ids]) != page['stamps']:
+            self.stale += 1
+            return None
+        return page
+
+    def set_page(self, snapshot, page):
+        """
+        Cache a page dict holding a 'students' list of serialized profiles,
+        unless a student was touched since the snapshot was taken
+        """
+        key, sequence = snapshot
+        ids = [student['id'] for student in page['students']]
+        sequence_now, *stamps = self.backend.get_counters(
+            [self.WRITE_SEQUENCE] + [self._stamp_name(i) for i in ids]
+        )
+        if sequence_now != sequence:
+            self.skipped += 1
+            return
+        self.backend.set(key, dict(page, stamps=stamps), self.ttl)
+
+    def touch_student(self, student_id, membership_changed=False, funding_changed=False):
+        """
+        Invalidate pages showing student_id, all pages if its filter
+        membership changed, or all funding-ordered pages if its amount
+        raised changed
+        """
+        # Sequence first: a set_page that sees the new stamp then also sees
+        # the new sequence, and skips the page
+        self.backend.incr(self.WRITE_SEQUENCE)
+        self.backend.incr(self._stamp_name(student_id))
+        if membership_changed:
+            self.backend.incr(self.GENERATION)
+        if funding_changed:
+            self.backend.incr(self.FUNDING_GENERATION)
+
+    def stats(self):
+        """
+        Backend counters, plus hits that were discarded as stale and loads
+        that were not cached because they overlapped a write
+        """
+        return dict(self.backend.stats(), stale=self.stale, skipped=self.skipped)
+
+
+def init_catalog_cache(app):
+    """Build the catalog cache for app from its CATALOG_CACHE_* config"""
+    backend_name = app.config.get('CATALOG_CACHE_BACKEND', 'memory')
+    max_entries = app.config.get('CATALOG_CACHE_MAX_ENTRIES', 1024)
+    if backend_name == 'memory':
+        backend = MemoryCacheBackend(max_entries=max_entries)
+    elif backend_name == 'sqlite':
+        backend = SQLiteCacheBackend(app.config['CATALOG_CACHE_PATH'], max_entries=max_entries)
+    else:
+        raise ValueError(f"Unknown CATALOG_CACHE_BACKEND: {backend_name}")
+    app.extensions['catalog_cache'] = CatalogCache(backend, ttl=app.config.get('CATALOG_CACHE_TTL', 60))
+    return app.extensions['catalog_cache']
+
+
+def get_catalog_cache():
+    return current_app.extensions['catalog_cache']
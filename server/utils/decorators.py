@@ -1,30 +1,49 @@
-import importlib
 from functools import wraps
-from flask import session, jsonify
+from flask import g, session, jsonify
 
-def _get_user_model():
+# Support both package and script run modes for imports
+try:
+    from ..models import User
+except ImportError:
+    from models import User
+from .sessions import session_identity_trusted
+
+def get_current_user():
+    """
+    Return the logged-in User, loading it at most once per request.
+
+    The user is cached on flask.g together with the session user id it was
+    loaded for, so a login or logout mid-request is still picked up.
     """
-    Try to import the User model from 'server.models' (package mode) first,
-    and fall back to 'models' (top-level) for other run modes.
+    user_id = session.get('user_id')
+    if not user_id:
+        return None
+    if g.get('current_user_id') != user_id:
+        g.current_user = User.query.get(user_id)
+        g.current_user_id = user_id
+    return g.current_user
+
+def get_current_role():
     """
-    for mod_name in ('server.models', 'models'):
-        try:
-            mod = importlib.import_module(mod_name)
-            return mod.User
-        except ModuleNotFoundError:
-            continue
-    raise ModuleNotFoundError("Could not import User model from 'server.models' or 'models'")
+    Role of the logged-in user, or None.
+
+    Server-side sessions cache the role at login and are revoked when it
+    changes, so no query is needed; cookie sessions fall back to the DB.
+    """
+    if not session.get('user_id'):
+        return None
+    if session_identity_trusted() and session.get('user_role'):
+        return session['user_role']
+    user = get_current_user()
+    return user.role if user else None
 
 def login_required(func):
     """Require an authenticated user (any role)."""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        user_id = session.get('user_id')
-        if not user_id:
+        if not session.get('user_id'):
             return jsonify({'error': 'Authentication required'}), 401
-        User = _get_user_model()
-        user = User.query.get(user_id)
-        if not user:
+        if not get_current_role():
             return jsonify({'error': 'Invalid session'}), 401
         return func(*args, **kwargs)
     return wrapper
@@ -33,12 +52,9 @@ def admin_required(func):
     """Require a logged-in admin user."""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        user_id = session.get('user_id')
-        if not user_id:
+        if not session.get('user_id'):
             return jsonify({'error': 'Authentication required'}), 401
-        User = _get_user_model()
-        user = User.query.get(user_id)
-        if not user or getattr(user, 'role', None) != 'admin':
+        if get_current_role() != 'admin':
             return jsonify({'error': 'Admin access required'}), 403
         return func(*args, **kwargs)
     return wrapper
@@ -47,12 +63,9 @@ def student_required(func):
     """Require a logged-in student user."""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        user_id = session.get('user_id')
-        if not user_id:
+        if not session.get('user_id'):
             return jsonify({'error': 'Authentication required'}), 401
-        User = _get_user_model()
-        user = User.query.get(user_id)
-        if not user or getattr(user, 'role', None) != 'student':
+        if get_current_role() != 'student':
             return jsonify({'error': 'Student access required'}), 403
         return func(*args, **kwargs)
     return wrapper
@@ -61,12 +74,9 @@ def donor_required(func):
     """Require a logged-in donor user."""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        user_id = session.get('user_id')
-        if not user_id:
+        if not session.get('user_id'):
             return jsonify({'error': 'Authentication required'}), 401
-        User = _get_user_model()
-        user = User.query.get(user_id)
-        if not user or getattr(user, 'role', None) != 'donor':
+        if get_current_role() != 'donor':
             return jsonify({'error': 'Donor access required'}), 403
         return func(*args, **kwargs)
-    return wrapper
\ No newline at end of file
+    return wrapper
@@ -0,0 +1,96 @@
+"""
+Bounded off-thread password hashing.
+
+PBKDF2 and scrypt release the GIL inside hashlib, so a thread pool runs
+them in parallel without blocking other request threads on the
+interpreter. The pool also caps how much hashing a worker takes on at
+once: past max_pending queued or running jobs, new ones fail fast with
+HasherBusy instead of piling up behind a login burst.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full"""
+
+
+class PasswordHasher:
+    def __init__(self, workers=4, max_pending=32):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hasher')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._stats_lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_hash_seconds = 0.0
+        self.max_hash_seconds = 0.0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _record(self, wait, duration):
+        with self._stats_lock:
+            self.completed += 1
+            self.total_wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            self.total_hash_seconds += duration
+            self.max_hash_seconds = max(self.max_hash_seconds, duration)
+
+    def _run(self, func, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.rejected += 1
+            raise HasherBusy('Too many password operations in progress, try again shortly')
+
+        with self._stats_lock:
+            self._pending += 1
+        submitted_at = time.perf_counter()
+
+        def job():
+            started_at = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._record(started_at - submitted_at, time.perf_counter() - started_at)
+
+        try:
+            return self._executor.submit(job).result()
+        finally:
+            with self._stats_lock:
+                self._pending -= 1
+            self._slots.release()
+
+    def hash(self, password, method, salt_length):
+        return self._run(generate_password_hash, password, method=method, salt_length=salt_length)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def stats(self):
+        with self._stats_lock:
+            completed = self.completed or 1
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'pending': self._pending,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'avg_hash_ms': self.total_hash_seconds / completed * 1000,
+                'max_hash_ms': self.max_hash_seconds * 1000,
+                'avg_queue_wait_ms': self.total_wait_seconds / completed * 1000,
+                'max_queue_wait_ms': self.max_wait_seconds * 1000
+            }
+
+
+def init_password_hasher(app):
+    """Build the app's password hasher from its PASSWORD_HASH_* config"""
+    app.extensions['password_hasher'] = PasswordHasher(
+        workers=app.config.get('PASSWORD_HASH_WORKERS', 4),
+        max_pending=app.config.get('PASSWORD_HASH_MAX_PENDING', 32)
+    )
+    return app.extensions['password_hasher']
@@ -0,0 +1,48 @@
+"""
+HTTP validator helpers (ETag / Last-Modified) for read-heavy endpoints.
+
+Routes compute a cheap validator first and call not_modified() before doing
+any serialization; on a match they return not_modified_response().
+"""
+import hashlib
+from datetime import timezone
+
+from flask import request, make_response
+
+
+def make_etag(*parts):
+    """Strong ETag value from the parts identifying a response's content"""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def _as_utc(value):
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def not_modified(etag, last_modified=None):
+    """True when the request's conditional headers match the current validators"""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    last_modified = _as_utc(last_modified)
+    if last_modified and request.if_modified_since:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def set_validators(response, etag, last_modified=None):
+    """Attach ETag/Last-Modified and require revalidation on every use"""
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = _as_utc(last_modified)
+    # Responses depend on the session (viewer's follow state, shuffle seed)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Cookie')
+    return response
+
+
+def not_modified_response(etag, last_modified=None):
+    return set_validators(make_response('', 304), etag, last_modified)
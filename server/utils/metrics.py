@@ -0,0 +1,208 @@
+"""
+Request timing and a Prometheus text-format /metrics endpoint.
+
+The request hooks only touch counters owned by the current thread: a
+bucket increment, a float add and a status count, with no locks. A scrape
+walks every thread's counters and sums them, folding the counters of
+threads that have exited (werkzeug starts one thread per request) into a
+single retired set so memory stays bounded by the live threads.
+
+Exported series:
+
+    elimufund_http_request_duration_seconds   histogram per blueprint/endpoint
+    elimufund_http_requests_total             counter per blueprint/endpoint/status
+    elimufund_http_requests_in_flight         gauge
+    elimufund_db_pool_*                       gauges per engine bind
+"""
+import hmac
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+from flask import Response, current_app, g, request
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Row layout: one slot per bucket, one for +Inf, then the sum of durations
+_SUM = len(BUCKETS) + 1
+
+
+class _ThreadMetrics:
+    """Counters written only by the owning thread"""
+
+    __slots__ = ('thread', 'started', 'finished', 'latency', 'statuses', '__weakref__')
+
+    def __init__(self, thread=None):
+        self.thread = weakref.ref(thread) if thread is not None else None
+        self.started = 0
+        self.finished = 0
+        self.latency = {}
+        self.statuses = {}
+
+    def alive(self):
+        thread = self.thread() if self.thread is not None else None
+        return thread is not None and thread.is_alive()
+
+    def merge(self, other):
+        self.started += other.started
+        self.finished += other.finished
+        for endpoint, row in list(other.latency.items()):
+            mine = self.latency.setdefault(endpoint, [0] * len(row))
+            for i, value in enumerate(row):
+                mine[i] += value
+        for endpoint, counts in list(other.statuses.items()):
+            mine = self.statuses.setdefault(endpoint, {})
+            for status, count in list(counts.items()):
+                mine[status] = mine.get(status, 0) + count
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._retired = _ThreadMetrics()
+        self._registrations = 0
+
+    def for_thread(self):
+        metrics = getattr(self._local, 'metrics', None)
+        if metrics is None:
+            metrics = self._local.metrics = _ThreadMetrics(threading.current_thread())
+            with self._lock:
+                self._threads.append(metrics)
+                self._registrations += 1
+                if self._registrations % 256 == 0:
+                    self._retire_dead()
+        return metrics
+
+    def _retire_dead(self):
+        """Fold exited threads' counters into the retired set (call with the lock held)"""
+        live = []
+        for metrics in self._threads:
+            if metrics.alive():
+                live.append(metrics)
+            else:
+                self._retired.merge(metrics)
+        self._threads = live
+
+    def collect(self):
+        """Sum of every thread's counters"""
+        total = _ThreadMetrics()
+        with self._lock:
+            self._retire_dead()
+            total.merge(self._retired)
+            for metrics in self._threads:
+                total.merge(metrics)
+        return total
+
+
+def _before_request():
+    g.metrics_started_at = time.perf_counter()
+    current_app.extensions['metrics'].for_thread().started += 1
+
+
+def _after_request(response):
+    started_at = g.get('metrics_started_at')
+    if started_at is None:
+        return response
+    elapsed = time.perf_counter() - started_at
+    metrics = current_app.extensions['metrics'].for_thread()
+    endpoint = request.endpoint or 'unmatched'
+
+    row = metrics.latency.get(endpoint)
+    if row is None:
+        row = metrics.latency[endpoint] = [0] * (_SUM + 1)
+        row[_SUM] = 0.0
+    row[bisect_left(BUCKETS, elapsed)] += 1
+    row[_SUM] += elapsed
+
+    statuses = metrics.statuses.get(endpoint)
+    if statuses is None:
+        statuses = metrics.statuses[endpoint] = {}
+    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    return response
+
+
+def _teardown_request(exception):
+    if g.get('metrics_started_at') is not None:
+        current_app.extensions['metrics'].for_thread().finished += 1
+
+
+def _labels(endpoint):
+    blueprint = endpoint.rpartition('.')[0] or 'app'
+    return f'blueprint="{blueprint}",endpoint="{endpoint}"'
+
+
+def _pool_lines(db):
+    lines = []
+    gauges = [
+        ('size', 'Configured pool size'),
+        ('checked_out', 'Connections currently in use'),
+        ('checked_in', 'Idle connections in the pool'),
+        ('overflow', 'Connections opened beyond the pool size'),
+    ]
+    engines = db.engines
+    for name, help_text in gauges:
+        metric = f'elimufund_db_pool_{name}'
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} gauge')
+        for bind, engine in engines.items():
+            method = getattr(engine.pool, name.replace('_', ''), None)
+            if callable(method):
+                # QueuePool reports overflow as negative until the pool is full
+                value = max(0, method()) if name == 'overflow' else method()
+                lines.append(f'{metric}{{bind="{bind or "default"}"}} {value}')
+    return lines
+
+
+def render_metrics(registry, db):
+    """Prometheus text exposition of the registry and DB pool gauges"""
+    totals = registry.collect()
+    lines = [
+        '# HELP elimufund_http_request_duration_seconds Request latency',
+        '# TYPE elimufund_http_request_duration_seconds histogram',
+    ]
+    for endpoint, row in sorted(totals.latency.items()):
+        labels = _labels(endpoint)
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ('+Inf',), row):
+            cumulative += count
+            lines.append(f'elimufund_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'elimufund_http_request_duration_seconds_sum{{{labels}}} {row[_SUM]:.6f}')
+        lines.append(f'elimufund_http_request_duration_seconds_count{{{labels}}} {cumulative}')
+
+    lines += [
+        '# HELP elimufund_http_requests_total Requests by response status',
+        '# TYPE elimufund_http_requests_total counter',
+    ]
+    for endpoint, counts in sorted(totals.statuses.items()):
+        labels = _labels(endpoint)
+        for status, count in sorted(counts.items()):
+            lines.append(f'elimufund_http_requests_total{{{labels},status="{status}"}} {count}')
+
+    lines += [
+        '# HELP elimufund_http_requests_in_flight Requests currently being handled',
+        '# TYPE elimufund_http_requests_in_flight gauge',
+        f'elimufund_http_requests_in_flight {totals.started - totals.finished}',
+    ]
+    lines += _pool_lines(db)
+    return '\n'.join(lines) + '\n'
+
+
+def init_metrics(app, db):
+    """Install the timing hooks and the /metrics route"""
+    registry = app.extensions['metrics'] = MetricsRegistry()
+    # Start the timer before the other request hooks and stop it after them
+    app.before_request_funcs.setdefault(None, []).insert(0, _before_request)
+    app.after_request_funcs.setdefault(None, []).insert(0, _after_request)
+    app.teardown_request(_teardown_request)
+
+    @app.route('/metrics')
+    def metrics():
+        token = current_app.config.get('METRICS_TOKEN')
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return Response(render_metrics(registry, db), mimetype='text/plain; version=0.0.4')
+
+    return registry
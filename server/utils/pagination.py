@@ -0,0 +1,86 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Cursors are opaque to the client: a urlsafe base64 encoded JSON object
+holding whatever the route needs to resume after the last row it served.
+"""
+import base64
+import json
+import random
+
+from sqlalchemy import BigInteger, cast
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Largest 31-bit prime; every intermediate product stays below 2**63
+_SHUFFLE_MODULUS = 2147483647
+
+
+def encode_cursor(payload):
+    """Serialize a cursor payload into an opaque string"""
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Parse a cursor produced by encode_cursor, raising ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeEncodeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(payload, dict):
+        raise ValueError('Invalid cursor')
+    return payload
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Clamp a ?limit= query value into [1, maximum]"""
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    return max(1, min(limit, maximum))
+
+
+def new_shuffle_seed(pool_size=None):
+    """
+    Random seed for a seeded shuffle ordering
+
+    With pool_size, the seed is one of pool_size fixed values, so sessions
+    share orderings (and cached pages) while still seeing varied orders.
+    """
+    if not pool_size:
+        return random.randrange(1, _SHUFFLE_MODULUS)
+    # Spread the pool indexes out; small seeds mix ids poorly
+    return (random.randrange(pool_size) * 1103515245 + 12345) % _SHUFFLE_MODULUS
+
+
+def parse_shuffle_seed(value):
+    """A seed sent back by the client (e.g. from a cookie), or None if invalid"""
+    try:
+        seed = int(value)
+    except (TypeError, ValueError):
+        return None
+    return seed if 0 < seed < _SHUFFLE_MODULUS else None
+
+
+def shuffle_key(id_column, seed):
+    """
+    SQL expression giving a stable pseudo-random sort key for id_column.
+
+    Unlike ORDER BY RANDOM() the key is deterministic for a given seed, so it
+    can be used for keyset pagination without repeating or skipping rows.
+    Keys are not guaranteed unique; order by (key, id) to break ties.
+    """
+    seed = int(seed) % _SHUFFLE_MODULUS or 1
+    offset = (seed * 7919) % _SHUFFLE_MODULUS
+    linear = (seed * 48271) % _SHUFFLE_MODULUS
+    
+    # x = (id * seed + offset) mod P, then x^2 + linear * x mod P to break up
+    # the runs a purely affine mapping leaves between neighbouring ids
+    x = (cast(id_column, BigInteger) * seed + offset) % _SHUFFLE_MODULUS
+    return ((x * x) % _SHUFFLE_MODULUS + (x * linear) % _SHUFFLE_MODULUS) % _SHUFFLE_MODULUS
@@ -0,0 +1,204 @@
+"""
+Per-request SQL instrumentation.
+
+Cursor execute events on every engine count each request's statements
+and time spent in the database, and remember its slowest statements.
+After the request the totals are:
+
+    - sent as X-Query-* response headers (SQL_STATS_HEADERS, on in debug)
+    - logged as one JSON line per request (SQL_STATS_LOG, outside debug)
+    - folded into per-endpoint aggregates for GET /api/admin/query-stats
+
+Any statement slower than SQL_SLOW_QUERY_MS is also logged on its own.
+"""
+import json
+import logging
+import re
+import threading
+import time
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Collapses expanded IN (?, ?, ...) lists so equivalent statements aggregate together
+_PARAM_LIST = re.compile(r'\(\s*(\?|%\(\w+\)s|%s)(\s*,\s*(\?|%\(\w+\)s|%s))+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_statement(statement, max_length=500):
+    statement = _WHITESPACE.sub(' ', statement).strip()
+    statement = _PARAM_LIST.sub('(...)', statement)
+    return statement[:max_length]
+
+
+class QueryStats:
+    """Aggregated per-endpoint query counts and the slowest statements seen"""
+
+    def __init__(self, slow_ms=200, top_n=5, max_statements=200):
+        self.slow_ms = slow_ms
+        self.top_n = top_n
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+            self.statements = {}
+
+    def record_request(self, endpoint, stats):
+        """Fold one request's totals (see _request_stats) into the aggregates"""
+        with self._lock:
+            entry = self.endpoints.setdefault(endpoint, {
+                'requests': 0, 'queries': 0, 'max_queries': 0,
+                'db_ms': 0.0, 'max_db_ms': 0.0, 'slow_queries': 0
+            })
+            entry['requests'] += 1
+            entry['queries'] += stats['count']
+            entry['max_queries'] = max(entry['max_queries'], stats['count'])
+            entry['db_ms'] += stats['seconds'] * 1000
+            entry['max_db_ms'] = max(entry['max_db_ms'], stats['seconds'] * 1000)
+            entry['slow_queries'] += stats['slow']
+
+            # The same statement run by different endpoints is tracked per endpoint
+            for seconds, statement in stats['slowest']:
+                summary = self.statements.get((endpoint, statement))
+                if summary is None:
+                    if len(self.statements) >= self.max_statements:
+                        continue
+                    summary = self.statements[(endpoint, statement)] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+                summary['count'] += 1
+                summary['total_ms'] += seconds * 1000
+                summary['max_ms'] = max(summary['max_ms'], seconds * 1000)
+
+    def snapshot(self, limit=20):
+        with self._lock:
+            endpoints = {
+                name: dict(entry,
+                           avg_queries=entry['queries'] / entry['requests'],
+                           avg_db_ms=entry['db_ms'] / entry['requests'])
+                for name, entry in self.endpoints.items()
+            }
+            slowest = sorted(
+                (
+                    {'endpoint': endpoint, 'statement': statement, **summary}
+                    for (endpoint, statement), summary in self.statements.items()
+                ),
+                key=lambda item: item['max_ms'], reverse=True
+            )[:limit]
+        return {
+            'slow_query_ms': self.slow_ms,
+            'endpoints': dict(sorted(endpoints.items(), key=lambda item: item[1]['db_ms'], reverse=True)),
+            'slowest_statements': slowest
+        }
+
+
+def _request_stats():
+    stats = g.get('sql_stats')
+    if stats is None:
+        stats = g.sql_stats = {'count': 0, 'seconds': 0.0, 'slow': 0, 'slowest': []}
+    return stats
+
+
+def _endpoint_name():
+    rule = request.url_rule.rule if request.url_rule else 'unmatched'
+    return f'{request.method} {rule}'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_started_at'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = conn.info.pop('query_started_at', None)
+    if started_at is None or not has_app_context():
+        return
+    query_stats = current_app.extensions.get('query_stats')
+    if query_stats is None:
+        return
+    seconds = time.perf_counter() - started_at
+    slow = seconds * 1000 >= query_stats.slow_ms
+
+    if slow:
+        current_app.logger.warning(json.dumps({
+            'event': 'slow_query',
+            'ms': round(seconds * 1000, 2),
+            'endpoint': _endpoint_name() if has_request_context() else None,
+            'statement': normalize_statement(statement)
+        }))
+
+    if not has_request_context():
+        return
+    stats = _request_stats()
+    stats['count'] += 1
+    stats['seconds'] += seconds
+    stats['slow'] += slow
+    slowest = stats['slowest']
+    if len(slowest) < query_stats.top_n or seconds > slowest[-1][0]:
+        slowest.append((seconds, normalize_statement(statement)))
+        slowest.sort(key=lambda item: item[0], reverse=True)
+        del slowest[query_stats.top_n:]
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None:
+        connection.info.pop('query_started_at', None)
+
+
+def _finish_request(response):
+    query_stats = current_app.extensions.get('query_stats')
+    stats = g.pop('sql_stats', None) or {'count': 0, 'seconds': 0.0, 'slow': 0, 'slowest': []}
+    endpoint = _endpoint_name()
+    query_stats.record_request(endpoint, stats)
+
+    headers = current_app.config.get('SQL_STATS_HEADERS')
+    if headers is None:
+        headers = current_app.debug
+    if headers:
+        response.headers['X-Query-Count'] = str(stats['count'])
+        response.headers['X-Query-Time-Ms'] = f"{stats['seconds'] * 1000:.2f}"
+        response.headers['X-Slow-Query-Count'] = str(stats['slow'])
+
+    if current_app.config.get('SQL_STATS_LOG', True) and not current_app.debug:
+        current_app.logger.info(json.dumps({
+            'event': 'request_queries',
+            'endpoint': endpoint,
+            'status': response.status_code,
+            'queries': stats['count'],
+            'db_ms': round(stats['seconds'] * 1000, 2),
+            'slow_queries': stats['slow'],
+            'slowest': [
+                {'ms': round(seconds * 1000, 2), 'statement': statement}
+                for seconds, statement in stats['slowest'][:3]
+            ]
+        }))
+    return response
+
+
+_listeners_installed = False
+
+
+def init_query_stats(app):
+    """Install the cursor listeners (once per process) and app's request hook"""
+    global _listeners_installed
+
+    if not _listeners_installed:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+        _listeners_installed = True
+
+    app.extensions['query_stats'] = QueryStats(
+        slow_ms=app.config.get('SQL_SLOW_QUERY_MS', 200),
+        top_n=app.config.get('SQL_STATS_TOP_N', 5)
+    )
+    app.after_request(_finish_request)
+    if app.config.get('SQL_STATS_LOG', True) and not app.debug and app.logger.level == logging.NOTSET:
+        app.logger.setLevel(logging.INFO)
+    return app.extensions['query_stats']
+
+
+def get_query_stats():
+    return current_app.extensions['query_stats']
@@ -0,0 +1,80 @@
+"""
+Read-replica routing.
+
+When DATABASE_REPLICA_URL is set it becomes the 'replica' engine bind.
+GET/HEAD requests to the blueprints in READ_REPLICA_BLUEPRINTS then read
+from it; everything else, and any write issued while serving such a
+request, goes to the primary.
+
+A replica lags the primary, so a client that has just written is pinned
+to the primary for READ_YOUR_WRITES_SECONDS: the pin is a timestamp in
+its session, set after any request that wrote to the database. Shared
+caches are filled inside reading_from_primary(), since their entries
+outlive the replica's lag.
+"""
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND = 'replica'
+
+
+class RoutingSession(Session):
+    """Sends reads to the replica bind when the current request allows it"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            writing = self._flushing or getattr(clause, 'is_dml', False)
+            if writing:
+                g.db_wrote = True
+            elif g.get('db_route') == REPLICA_BIND:
+                engine = self._db.engines.get(REPLICA_BIND)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def pin_to_primary():
+    """Serve this client's reads from the primary for the read-your-writes window"""
+    window = current_app.config.get('READ_YOUR_WRITES_SECONDS', 5)
+    if window > 0:
+        session['primary_until'] = time.time() + window
+
+
+@contextmanager
+def reading_from_primary():
+    """
+    Read from the primary inside the block. Use it to fill caches that
+    writes invalidate: a fill read from a lagging replica would store the
+    pre-write rows under the post-write invalidation stamps.
+    """
+    route = g.get('db_route')
+    g.db_route = None
+    try:
+        yield
+    finally:
+        g.db_route = route
+
+
+def _choose_route():
+    if (request.method in ('GET', 'HEAD')
+            and request.blueprint in current_app.config.get('READ_REPLICA_BLUEPRINTS', ())
+            and session.get('primary_until', 0) <= time.time()):
+        g.db_route = REPLICA_BIND
+
+
+def _pin_after_write(response):
+    if g.get('db_wrote'):
+        pin_to_primary()
+    return response
+
+
+def init_read_replica(app, db):
+    """Route reads to the replica bind, if one is configured"""
+    if REPLICA_BIND not in app.config.get('SQLALCHEMY_BINDS', {}):
+        return False
+    app.before_request(_choose_route)
+    app.after_request(_pin_after_write)
+    return True
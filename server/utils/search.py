@@ -0,0 +1,188 @@
+"""
+Full-text search over student names, schools and stories.
+
+SQLite uses an FTS5 table (student_profiles_fts) over the profile columns;
+Postgres uses a weighted tsvector column with a GIN index. In both cases
+database triggers keep the index in step with every insert, update and
+delete of student_profiles, whichever code path makes it. The DDL is run
+when student_profiles is created (db.create_all) and by the migration;
+`flask rebuild-search-index` reinstalls it and rebuilds the index in bulk,
+e.g. after a SQLite batch migration has recreated the table (and dropped
+its triggers).
+
+Other databases fall back to unranked LIKE matching.
+"""
+import html
+import re
+
+from sqlalchemy import event, text
+
+# Search results are highlighted with these private-use characters, so the
+# text can be HTML-escaped before they are swapped for <mark> tags
+_START, _STOP = '\ue000', '\ue001'
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+MAX_QUERY_TOKENS = 8
+
+# Weights for full_name, school_name and story
+SQLITE_WEIGHTS = (10.0, 5.0, 1.0)
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS student_profiles_fts USING fts5(
+        full_name, school_name, story,
+        content='student_profiles', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS student_profiles_fts_insert AFTER INSERT ON student_profiles BEGIN
+        INSERT INTO student_profiles_fts(rowid, full_name, school_name, story)
+        VALUES (new.id, new.full_name, new.school_name, new.story);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS student_profiles_fts_delete AFTER DELETE ON student_profiles BEGIN
+        INSERT INTO student_profiles_fts(student_profiles_fts, rowid, full_name, school_name, story)
+        VALUES ('delete', old.id, old.full_name, old.school_name, old.story);
+    END""",
+    # Only edits to indexed columns touch the index, not donation updates
+    """CREATE TRIGGER IF NOT EXISTS student_profiles_fts_update
+    AFTER UPDATE OF full_name, school_name, story ON student_profiles BEGIN
+        INSERT INTO student_profiles_fts(student_profiles_fts, rowid, full_name, school_name, story)
+        VALUES ('delete', old.id, old.full_name, old.school_name, old.story);
+        INSERT INTO student_profiles_fts(rowid, full_name, school_name, story)
+        VALUES (new.id, new.full_name, new.school_name, new.story);
+    END""",
+]
+SQLITE_DROP = ['DROP TABLE IF EXISTS student_profiles_fts']
+
+POSTGRES_VECTOR = """
+    setweight(to_tsvector('english', coalesce({row}full_name, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({row}school_name, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({row}story, '')), 'C')
+"""
+POSTGRES_DDL = [
+    'ALTER TABLE student_profiles ADD COLUMN IF NOT EXISTS search_vector tsvector',
+    'CREATE INDEX IF NOT EXISTS ix_student_profiles_search_vector ON student_profiles USING GIN (search_vector)',
+    f"""CREATE OR REPLACE FUNCTION student_profiles_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := {POSTGRES_VECTOR.format(row='NEW.')};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    'DROP TRIGGER IF EXISTS student_profiles_search_vector_trigger ON student_profiles',
+    """CREATE TRIGGER student_profiles_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF full_name, school_name, story ON student_profiles
+    FOR EACH ROW EXECUTE FUNCTION student_profiles_search_vector_update()""",
+]
+POSTGRES_DROP = ['DROP FUNCTION IF EXISTS student_profiles_search_vector_update() CASCADE']
+
+
+def _statements(dialect_name, drop=False):
+    if dialect_name == 'sqlite':
+        return SQLITE_DROP if drop else SQLITE_DDL
+    if dialect_name == 'postgresql':
+        return POSTGRES_DROP if drop else POSTGRES_DDL
+    return []
+
+
+def install_search_ddl(table):
+    """Create the search index and triggers along with table (and drop them with it)"""
+    @event.listens_for(table, 'after_create')
+    def create_search_index(target, connection, **kw):
+        for statement in _statements(connection.dialect.name):
+            connection.execute(text(statement))
+
+    @event.listens_for(table, 'before_drop')
+    def drop_search_index(target, connection, **kw):
+        for statement in _statements(connection.dialect.name, drop=True):
+            connection.execute(text(statement))
+
+
+def rebuild_search_index(db):
+    """(Re)install the search DDL and rebuild the index from student_profiles"""
+    dialect_name = db.engine.dialect.name
+    with db.engine.begin() as connection:
+        for statement in _statements(dialect_name):
+            connection.execute(text(statement))
+        if dialect_name == 'sqlite':
+            connection.execute(text("INSERT INTO student_profiles_fts(student_profiles_fts) VALUES ('rebuild')"))
+        elif dialect_name == 'postgresql':
+            connection.execute(text(f"UPDATE student_profiles SET search_vector = {POSTGRES_VECTOR.format(row='')}"))
+        return connection.execute(text('SELECT COUNT(*) FROM student_profiles')).scalar()
+
+
+def query_tokens(query):
+    """Words of a free-text query, stripped of any search syntax"""
+    return _TOKEN.findall(query.lower())[:MAX_QUERY_TOKENS]
+
+
+def highlight(value):
+    """HTML-escape a highlighted fragment and wrap its matches in <mark>"""
+    if value is None:
+        return None
+    return html.escape(value).replace(_START, '<mark>').replace(_STOP, '</mark>')
+
+
+def search_student_ids(session, query, limit, offset=0, verified_only=True):
+    """
+    Ranked matches for a free-text query as (id, rank, highlights) tuples.
+
+    Every word must match (the last one as a prefix, for search-as-you-type).
+    Rank is higher for better matches; highlights hold the name and school
+    with matches marked and a snippet of the story around them.
+    """
+    tokens = query_tokens(query)
+    if not tokens:
+        return []
+    dialect_name = session.get_bind().dialect.name
+    params = {'limit': limit, 'offset': offset}
+    verified = 'AND p.is_verified' if verified_only else ''
+
+    if dialect_name == 'sqlite':
+        # Quoted terms can't be parsed as FTS5 operators
+        params['match'] = ' '.join(f'"{token}"' for token in tokens) + '*'
+        weights = ', '.join(str(weight) for weight in SQLITE_WEIGHTS)
+        rows = session.execute(text(f"""
+            SELECT p.id, -bm25(student_profiles_fts, {weights}) AS rank,
+                highlight(student_profiles_fts, 0, '{_START}', '{_STOP}'),
+                highlight(student_profiles_fts, 1, '{_START}', '{_STOP}'),
+                snippet(student_profiles_fts, 2, '{_START}', '{_STOP}', '…', 24)
+            FROM student_profiles_fts
+            JOIN student_profiles p ON p.id = student_profiles_fts.rowid
+            WHERE student_profiles_fts MATCH :match {verified}
+            ORDER BY bm25(student_profiles_fts, {weights}), p.id
+            LIMIT :limit OFFSET :offset
+        """), params).all()
+    elif dialect_name == 'postgresql':
+        params['tsquery'] = ' & '.join(tokens) + ':*'
+        options = f'StartSel={_START}, StopSel={_STOP}, HighlightAll=true'
+        rows = session.execute(text(f"""
+            SELECT p.id, ts_rank_cd(p.search_vector, q) AS rank,
+                ts_headline('english', p.full_name, q, '{options}'),
+                ts_headline('english', p.school_name, q, '{options}'),
+                ts_headline('english', p.story, q, 'StartSel={_START}, StopSel={_STOP}, MaxWords=30, MinWords=12')
+            FROM student_profiles p, to_tsquery('english', :tsquery) q
+            WHERE p.search_vector @@ q {verified}
+            ORDER BY rank DESC, p.id
+            LIMIT :limit OFFSET :offset
+        """), params).all()
+    else:
+        conditions = []
+        for i, token in enumerate(tokens):
+            params[f'token{i}'] = f'%{token}%'
+            conditions.append(
+                f'(LOWER(p.full_name) LIKE :token{i} OR LOWER(p.school_name) LIKE :token{i} '
+                f'OR LOWER(p.story) LIKE :token{i})'
+            )
+        rows = session.execute(text(f"""
+            SELECT p.id, 0.0, p.full_name, p.school_name, NULL
+            FROM student_profiles p
+            WHERE {' AND '.join(conditions)} {verified}
+            ORDER BY p.id
+            LIMIT :limit OFFSET :offset
+        """), params).all()
+
+    return [
+        (student_id, float(rank or 0), {
+            'full_name': highlight(full_name),
+            'school_name': highlight(school_name),
+            'story': highlight(story)
+        })
+        for student_id, rank, full_name, school_name, story in rows
+    ]
@@ -0,0 +1,228 @@
+"""
+Server-side session storage.
+
+With SESSION_TYPE = 'cookie' (the default) Flask's signed-cookie sessions
+are used unchanged. The other types keep session data on the server and
+put only a signed session id in the cookie:
+
+    'memory'  in-process LRU (single worker / development)
+    'sqlite'  local SQLite file shared by every worker on the host
+    'redis'   any client exposing Redis' get/setex/delete (redis-py, or a
+              local stand-in such as fakeredis)
+
+Server-side sessions can be revoked, so the identity cached in them at
+login (user id, role, student profile id) is trusted by the auth
+decorators without a database lookup. A user's sessions are revoked when
+their role changes.
+
+Only logged-in sessions are stored: anonymous visitors (crawlers, catalog
+browsing) get no record and no cookie, so they can't crowd logged-in
+users out of the store. The memory and sqlite stores never evict a
+session before it expires.
+"""
+import json
+import secrets
+
+from flask import current_app, session
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.attributes import NO_VALUE
+from werkzeug.datastructures import CallbackDict
+
+from .cache import MemoryCacheBackend, SQLiteCacheBackend
+
+
+class RedisSessionStore:
+    """Adapts a Redis-compatible client to the get/set/delete store interface"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, key):
+        value = self.client.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.setex(key, int(ttl), json.dumps(value))
+
+    def delete(self, key):
+        self.client.delete(key)
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.previous_sid = None
+
+    def rotate(self):
+        """Move the session to a fresh id (call on login to prevent fixation)"""
+        if self.previous_sid is None:
+            self.previous_sid = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.modified = True
+
+
+class ServerSideSessionInterface(SessionInterface):
+    # Identity stored in these sessions can be revoked, so it may be trusted
+    trusts_identity = True
+
+    def __init__(self, store, key_prefix='session:'):
+        self.store = store
+        self.key_prefix = key_prefix
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='server-side-session')
+
+    def _key(self, sid):
+        return self.key_prefix + sid
+
+    def _user_key(self, user_id):
+        return f'{self.key_prefix}user:{user_id}'
+
+    def _ttl(self, app):
+        return int(app.permanent_session_lifetime.total_seconds())
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode('utf-8')
+            except BadSignature:
+                sid = None
+            if sid:
+                data = self.store.get(self._key(sid))
+                if data is not None:
+                    return ServerSideSession(data, sid=sid)
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.previous_sid:
+            self.store.delete(self._key(session.previous_sid))
+
+        if not session.get('user_id'):
+            # Logged out (or never logged in): drop any stored record
+            if not session.new:
+                self.store.delete(self._key(session.sid))
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if not (session.modified or session.new or self.should_set_cookie(app, session)):
+            return
+
+        self.store.set(self._key(session.sid), dict(session), self._ttl(app))
+        if session.new or session.previous_sid:
+            self._index_session(app, session['user_id'], session.sid)
+
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid.encode('utf-8')).decode('utf-8'),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+
+    def _index_session(self, app, user_id, sid):
+        """Remember which sessions belong to a user, for revoke_user"""
+        key = self._user_key(user_id)
+        sids = [s for s in (self.store.get(key) or []) if self.store.get(self._key(s)) is not None]
+        if sid not in sids:
+            sids.append(sid)
+        self.store.set(key, sids, self._ttl(app))
+
+    def revoke_user(self, user_id):
+        """Delete every session belonging to user_id"""
+        key = self._user_key(user_id)
+        for sid in self.store.get(key) or []:
+            self.store.delete(self._key(sid))
+        self.store.delete(key)
+
+
+def session_identity_trusted():
+    """True when the session store can revoke, so cached identity may be trusted"""
+    return getattr(current_app.session_interface, 'trusts_identity', False)
+
+
+def remember_identity(user):
+    """Cache the user's identity in the session at login/signup"""
+    if hasattr(session, 'rotate'):
+        session.rotate()
+    session['user_id'] = user.id
+    session['user_role'] = user.role
+    session['user'] = user.to_dict_basic()
+    profile = user.student_profile if user.role == 'student' else None
+    session['student_profile_id'] = profile.id if profile else None
+
+
+def revoke_user_sessions(user_id):
+    """Log a user out everywhere (no-op for cookie sessions)"""
+    interface = current_app.session_interface
+    if hasattr(interface, 'revoke_user'):
+        interface.revoke_user(user_id)
+
+
+def _watch_role_changes(db, User):
+    """Revoke a user's sessions once a change to their role is committed"""
+    @event.listens_for(User.role, 'set')
+    def role_set(target, value, oldvalue, initiator):
+        if target.id is None or oldvalue in (NO_VALUE, None) or oldvalue == value:
+            return
+        db_session = object_session(target) or db.session
+        db_session.info.setdefault('role_changed_user_ids', set()).add(target.id)
+
+    @event.listens_for(db.session, 'after_commit')
+    def revoke_after_commit(db_session):
+        user_ids = db_session.info.pop('role_changed_user_ids', None)
+        for user_id in user_ids or ():
+            revoke_user_sessions(user_id)
+
+    @event.listens_for(db.session, 'after_rollback')
+    def forget_after_rollback(db_session):
+        db_session.info.pop('role_changed_user_ids', None)
+
+
+_role_watch_installed = False
+
+
+def init_session_store(app, db, User):
+    """Install the server-side session interface selected by SESSION_TYPE"""
+    global _role_watch_installed
+
+    session_type = app.config.get('SESSION_TYPE', 'cookie')
+    max_entries = app.config.get('SESSION_MAX_ENTRIES', 10000)
+    if session_type == 'cookie':
+        return None
+    if session_type == 'memory':
+        store = MemoryCacheBackend(max_entries=max_entries, evict_live=False)
+    elif session_type in ('sqlite', 'filesystem'):
+        store = SQLiteCacheBackend(app.config['SESSION_FILE_PATH'], max_entries=max_entries, evict_live=False)
+    elif session_type == 'redis':
+        client = app.config.get('SESSION_REDIS')
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("SESSION_TYPE 'redis' needs the redis package or a SESSION_REDIS client")
+            client = redis.Redis.from_url(app.config['SESSION_REDIS_URL'])
+        store = RedisSessionStore(client)
+    else:
+        raise ValueError(f"Unknown SESSION_TYPE: {session_type}")
+
+    app.session_interface = ServerSideSessionInterface(store)
+    if not _role_watch_installed:
+        _watch_role_changes(db, User)
+        _role_watch_installed = True
+    return app.session_interface